@@ -2,11 +2,17 @@ import asyncio
 import logging
 import re
 import html 
+import time
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from config import *
 from monitor import monitor_interfaces, start_monitoring, stop_monitoring, is_monitoring_active, get_current_router_ip
-from snmp_manager import get_simplified_interface_name, CiscoSNMPManager
+from snmp_manager import CiscoSNMPManager, SNMPWalkError, format_status, index_to_str, get_simplified_interface_name
+from fleet_index import fleet_index
+from status_view import (
+    get_status_view, is_snapshot_fresh, store_snapshot, set_name_filter, clear_filters,
+    page_count, render_status_page
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +35,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE, snmp
         return
     
     if snmp_manager and snmp_manager.host:
-        ok, uptime_text = snmp_manager.snmp_SYSUPTIME()
+        ok, uptime_text = await snmp_manager.coalesced('snmp_SYSUPTIME')
         if not ok:
             uptime_text = f"{uptime_text}"
         
@@ -72,7 +78,7 @@ async def handle_start_monitoring(update: Update, context: ContextTypes.DEFAULT_
         return
 
     # Start
-    success = start_monitoring(user_chat_id, snmp_manager)
+    success = await start_monitoring(user_chat_id, snmp_manager)
     
     if success:
         success_message = (
@@ -157,6 +163,8 @@ async def handle_set_router_ip(update: Update, context: ContextTypes.DEFAULT_TYP
         "Enter the new router IP address:",
         reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Cancel", callback_data="cancel_set_ip")]])
     )
+    # Only one pending text prompt at a time, the next message is the IP
+    context.user_data.pop('awaiting_status_regex', None)
     context.user_data['awaiting_ip'] = True
 
 async def handle_cancel_set_ip(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -164,6 +172,7 @@ async def handle_cancel_set_ip(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.answer()
     
     context.user_data.pop('awaiting_ip', None)
+    context.user_data.pop('awaiting_status_regex', None)
     await query.edit_message_text(
         "IP setting cancelled.",
         reply_markup=get_main_menu_keyboard()
@@ -183,6 +192,126 @@ def _split_by_lines_for_tg(text: str, max_len: int = 3500) -> list[str]:
         chunks.append("\n".join(buf))
     return chunks
 
+async def _stream_status_snapshot(context, chat_id, message_id, snmp_manager):
+    # Walks the interface table into the chat's status view, editing the
+    # first page in as rows arrive and finishing with the paginated keyboard
+    view = get_status_view(snmp_manager.host, chat_id)
+    view['page'] = 0
+    view['taken_at'] = None
+    started = time.monotonic()
+    first_row_at = None
+    last_edit = 0.0
+    interfaces = []
+    view['interfaces'] = interfaces
+
+    async def edit(text, reply_markup=None):
+        await context.bot.edit_message_text(
+            text,
+            chat_id=chat_id,
+            message_id=message_id,
+            parse_mode='HTML',
+            reply_markup=reply_markup
+        )
+
+    inventory = []
+    try:
+        # IP mapping is small compared to the interface table, fetch it up front
+        interface_addresses = {}
+        async for row in snmp_manager.coalesced_table_stream(INTERFACE_IP_INDEX_OID, INTERFACE_IP_MASK_OID):
+            interface_idx, netmask = row.values
+            interface_addresses.setdefault(interface_idx, []).append((index_to_str(row.index), netmask or "255.255.255.255"))
+        interface_ips = {
+            index: [ip for ip, _ in addresses] for index, addresses in interface_addresses.items()
+        }
+
+        async def add_status(selected):
+            # ifOperStatus is only requested for selected interfaces, a page
+            # at a time; concurrent viewers share the same batches
+            nonlocal first_row_at, last_edit
+            oids = tuple(f"{INTERFACE_STATUS_OID}.{index}" for index, _ in selected)
+            values = await snmp_manager.coalesced('snmp_get', oids)
+            missing = [oid for oid in oids if not values or values.get(oid) is None]
+            if missing:
+                # An unanswered read is not an 'unknown' interface
+                raise SNMPWalkError(f"no ifOperStatus for {len(missing)} of {len(oids)} interfaces")
+            for (index, name), oid in zip(selected, oids):
+                interfaces.append({
+                    'name': name,
+                    'ip': ", ".join(interface_ips.get(index, [])) or "No IP",
+                    'status': format_status(values[oid]),
+                    'index': index
+                })
+
+            if first_row_at is None:
+                first_row_at = time.monotonic()
+                await edit(render_status_page(view, loading=True)[0])
+                last_edit = time.monotonic()
+            elif time.monotonic() - last_edit >= STATUS_STREAM_EDIT_INTERVAL:
+                await edit(render_status_page(view, loading=True)[0])
+                last_edit = time.monotonic()
+
+        # The fleet index gets every interface, the view only the selected ones
+        interface_filter = snmp_manager.interface_filter
+        metadata_oids = interface_filter.metadata_oids()
+        selected = []
+        async for row in snmp_manager.coalesced_table_stream(INTERFACE_NAME_OID, *metadata_oids):
+            name = row.values[0]
+            if name is None:
+                continue
+            index = index_to_str(row.index)
+            inventory.append({'index': index, 'name': name, 'addresses': interface_addresses.get(index, [])})
+
+            metadata = dict(zip(metadata_oids, row.values[1:]))
+            if not interface_filter.matches(
+                    name, metadata.get(INTERFACE_TYPE_OID), metadata.get(INTERFACE_ADMIN_STATUS_OID)):
+                continue
+
+            selected.append((index, name))
+            if len(selected) >= STATUS_PAGE_SIZE:
+                await add_status(selected)
+                selected = []
+
+        if selected:
+            await add_status(selected)
+    except SNMPWalkError as e:
+        # A walk that dies partway is not a smaller table: keep neither a
+        # snapshot nor index entries built from the rows seen so far
+        view['interfaces'] = []
+        logger.error(f"Status table for {snmp_manager.host} incomplete: {e}")
+        await edit(html.escape(f"Reading interfaces of router {snmp_manager.host} failed, please try again."))
+        return False
+
+    if inventory:
+        fleet_index.update_device(snmp_manager.host, inventory)
+
+    if not interfaces:
+        await edit(html.escape(f"No interface data found on router {snmp_manager.host}"))
+        return False
+
+    store_snapshot(view, interfaces)
+    text, keyboard = render_status_page(view)
+    await edit(text, reply_markup=keyboard)
+
+    logger.info(
+        f"Status table for {snmp_manager.host}: first row after {first_row_at - started:.2f}s, "
+        f"full table after {time.monotonic() - started:.2f}s ({len(interfaces)} interfaces)"
+    )
+    return True
+
+async def _show_status_view(context, chat_id, message_id, snmp_manager):
+    view = get_status_view(snmp_manager.host, chat_id)
+    if is_snapshot_fresh(view):
+        text, keyboard = render_status_page(view)
+        await context.bot.edit_message_text(
+            text,
+            chat_id=chat_id,
+            message_id=message_id,
+            parse_mode='HTML',
+            reply_markup=keyboard
+        )
+        return True
+    return await _stream_status_snapshot(context, chat_id, message_id, snmp_manager)
+
 async def handle_show_status(update: Update, context: ContextTypes.DEFAULT_TYPE, snmp_manager) -> None:
     query = update.callback_query
     await query.answer()
@@ -194,59 +323,71 @@ async def handle_show_status(update: Update, context: ContextTypes.DEFAULT_TYPE,
         )
         return
     
-    await query.edit_message_text("Querying router interfaces...")
+    view = get_status_view(snmp_manager.host, update.effective_chat.id)
+    if not is_snapshot_fresh(view):
+        await query.edit_message_text("Querying router interfaces...")
     
     try:
-        # Get if
-        success, data = snmp_manager.get_interface_data()
-        
-        if success and data:
-            # Format
-            response_lines = [
-                f"Router Interface Status - {snmp_manager.host}",
-                "-" * 45,
-                f"{'Interface':<12} | {'IP Address':<20} | {'Status':<8}"
-            ]
-            response_lines.append("-" * 45)
-            
-            # Add if
-            for interface in data:
-                interface_name = get_simplified_interface_name(interface['name'])
-                ip_address = interface['ip']
-                status = interface['status']
-              
-                response_lines.append(
-                    f"{interface_name:<12} | {ip_address:<20} | {status:<8}"
-                )
-            
-            response_message = "\n".join(response_lines)
-            
-        elif success and not data:
-            response_message = (
-                f"No interface data found on router {snmp_manager.host}\n\n"
-            )
-        else:
-            response_message = (
-                f"Failed to query router at {snmp_manager.host}\n"
-                f"Error: {data}\n\n"
-            )
-        
-        # Split
-        chunks = _split_by_lines_for_tg(response_message, max_len=3500)
+        if await _show_status_view(context, update.effective_chat.id, query.message.message_id, snmp_manager):
+            await send_main_menu(context, update.effective_chat.id, "Interface status retrieved.")
 
-        first_html = f"<pre>{html.escape(chunks[0])}</pre>"
-        await query.edit_message_text(first_html, parse_mode='HTML')
 
-        for chunk in chunks[1:]:
-            await context.bot.send_message(
-                chat_id=update.effective_chat.id,
-                text=f"<pre>{html.escape(chunk)}</pre>",
-                parse_mode='HTML',
-                disable_web_page_preview=True
-            )
+    except Exception as e:
+        error_message = f"Bot Error: {str(e)}"
+        logger.error(error_message)
+        await query.edit_message_text(
+            error_message,
+            reply_markup=get_main_menu_keyboard()
+        )
 
-        await send_main_menu(context, update.effective_chat.id, "Interface status retrieved.")
+async def handle_status_view(update: Update, context: ContextTypes.DEFAULT_TYPE, snmp_manager) -> None:
+    query = update.callback_query
+    action = query.data
+    chat_id = update.effective_chat.id
+
+    if not snmp_manager.host:
+        await query.answer()
+        await query.edit_message_text(
+            "No router IP set. Please use the 'Set Router IP' button to configure the router IP.",
+            reply_markup=get_main_menu_keyboard()
+        )
+        return
 
+    if action == "status_filter:name":
+        context.user_data.pop('awaiting_ip', None)
+        context.user_data['awaiting_status_regex'] = query.message.message_id
+        await query.answer("Send a regex to filter interface names (empty '-' clears it)")
+        return
+
+    await query.answer()
+    view = get_status_view(snmp_manager.host, chat_id)
+
+    try:
+        if action == "status_refresh" or not is_snapshot_fresh(view):
+            await query.edit_message_text("Querying router interfaces...")
+            await _stream_status_snapshot(context, chat_id, query.message.message_id, snmp_manager)
+            return
+
+        previous = (view['page'], view['down_only'], view['has_ip'], view['name_regex'])
+        if action == "status_page:prev":
+            view['page'] = max(0, view['page'] - 1)
+        elif action == "status_page:next":
+            view['page'] = min(page_count(view) - 1, view['page'] + 1)
+        elif action == "status_filter:down":
+            view['down_only'] = not view['down_only']
+            view['page'] = 0
+        elif action == "status_filter:ip":
+            view['has_ip'] = not view['has_ip']
+            view['page'] = 0
+        elif action == "status_filter:clear":
+            clear_filters(view)
+
+        # Telegram rejects edits that do not change the message
+        if (view['page'], view['down_only'], view['has_ip'], view['name_regex']) == previous:
+            return
+
+        text, keyboard = render_status_page(view)
+        await query.edit_message_text(text, parse_mode='HTML', reply_markup=keyboard)
 
     except Exception as e:
         error_message = f"Bot Error: {str(e)}"
@@ -257,6 +398,29 @@ async def handle_show_status(update: Update, context: ContextTypes.DEFAULT_TYPE,
         )
 
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE, snmp_manager) -> None:
+    if context.user_data.get('awaiting_status_regex'):
+        pattern = update.message.text.strip()
+        view = get_status_view(snmp_manager.host, update.effective_chat.id)
+        try:
+            set_name_filter(view, "" if pattern == "-" else pattern)
+        except re.error as e:
+            await update.message.reply_text(f"Invalid regex: {e}. Send another pattern or '-' to clear it:")
+            return
+
+        message_id = context.user_data.pop('awaiting_status_regex')
+        if is_snapshot_fresh(view):
+            text, keyboard = render_status_page(view)
+            await context.bot.edit_message_text(
+                text,
+                chat_id=update.effective_chat.id,
+                message_id=message_id,
+                parse_mode='HTML',
+                reply_markup=keyboard
+            )
+        else:
+            await _stream_status_snapshot(context, update.effective_chat.id, message_id, snmp_manager)
+        return
+
     if context.user_data.get('awaiting_ip'):
         ip_input = update.message.text.strip()
         ip_pattern = re.compile(r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$")
@@ -296,9 +460,6 @@ async def stop_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         )
 
 async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE, snmp_manager) -> None:
-    query = update.callback_query
-    await query.answer()   
-    
     if not snmp_manager.host:
         await update.message.reply_text(
             "No router IP set. Please use the 'Set Router IP' button to configure the router IP.",
@@ -309,76 +470,48 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE, snm
     processing_msg = await update.message.reply_text("Querying router interfaces...")
     
     try:
-        # Get if data
-        success, data = snmp_manager.get_interface_data()
-        
-        if success and data:
-            # Format
-            response_lines = [
-                f"Router Interface Status - {snmp_manager.host}",
-                "=" * 45,
-                f"{'Interface':<12} | {'IP Address':<20} | {'Status':<8}"
-            ]
-            response_lines.append("-" * 45)
-            
-            # Add interface data
-            for interface in data:
-                interface_name = get_simplified_interface_name(interface['name'])
-                ip_address = interface['ip']
-                status = interface['status']
-              
-                response_lines.append(
-                    f"{interface_name:<12} | {ip_address:<20} | {status:<8}"
-                )
-            
-            response_message = "\n".join(response_lines)
-            
-        elif success and not data:
-            response_message = (
-                f"No interface data found on router {snmp_manager.host}\n\n"
-            )
-        else:
-            response_message = (
-                f"Failed to query router at {snmp_manager.host}\n"
-                f"Error: {data}\n\n"
-            )
-        
-        await processing_msg.delete()
-        
-        # Split message
-        lines = response_message.splitlines()
-        chunks = []
-        chunk = []
-        for line in lines:
-            if sum(len(l) + 1 for l in chunk) + len(line) + 1 > 4000:
-                chunks.append("\n".join(chunk))
-                chunk = []
-            chunk.append(line)
-        if chunk:
-            chunks.append("\n".join(chunk))
-        
-        for i, chunk in enumerate(chunks):
-            text = f"```\n{chunk}\n```"
-            if i == 0:
-                await query.edit_message_text(text, parse_mode='Markdown')
-            else:
-                await context.bot.send_message(
-                    chat_id=update.effective_chat.id,
-                    text=text,
-                    parse_mode='Markdown'
-                )
-        
-        await send_main_menu(context, update.effective_chat.id, "Interface status retrieved.")
+        if await _show_status_view(context, update.effective_chat.id, processing_msg.message_id, snmp_manager):
+            await send_main_menu(context, update.effective_chat.id, "Interface status retrieved.")
 
         
     except Exception as e:
         error_message = f"Bot Error: {str(e)}"
         logger.error(error_message)
-        await query.edit_message_text(
+        await processing_msg.edit_text(
             error_message,
             reply_markup=get_main_menu_keyboard()
         )
 
+async def find_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    # Answered from the fleet index only, no router is queried
+    query = " ".join(context.args or []).strip()
+    if not query:
+        await update.message.reply_text(
+            "Usage: /find <ip|subnet|interface>\n\n"
+            "Examples:\n/find 10.0.0.1\n/find 10.0.0.0/24\n/find Gi0/1"
+        )
+        return
+
+    match, results = fleet_index.lookup(query)
+    if not results:
+        await update.message.reply_text(
+            f"No interface matches {query}.\n\n"
+            "The index covers routers that have been monitored or queried with /status."
+        )
+        return
+
+    lines = [f"{'Router':<15} | {'Interface':<15} | Addresses", "-" * 50]
+    for entry in results:
+        addresses = ", ".join(f"{ip}/{network.prefixlen}" for ip, network in entry['addresses']) or "No IP"
+        lines.append(
+            f"{entry['device']:<15} | {get_simplified_interface_name(entry['name']):<15} | {addresses}"
+        )
+
+    await update.message.reply_text(
+        f"Matched {match} for {html.escape(query)}:\n<pre>" + html.escape("\n".join(lines)) + "</pre>",
+        parse_mode='HTML'
+    )
+
 async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text(
         "Unknown command found.\n\n"
@@ -386,5 +519,6 @@ async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         "/start - Start monitoring\n"
         "/stop - Stop monitoring\n"
         "/status - Display interface table\n"
+        "/find - Locate an IP, subnet or interface\n"
         "/set - Set router IP address"
     )
\ No newline at end of file
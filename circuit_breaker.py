@@ -0,0 +1,61 @@
+import time
+from config import *
+
+CLOSED = "closed"
+OPEN = "open"
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive failures. While open, callers
+    # only send a probe when probe_due() says so; each failed probe doubles the
+    # wait up to `max_probe_interval`, a successful one closes the breaker.
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 probe_interval=BREAKER_PROBE_INTERVAL, max_probe_interval=BREAKER_MAX_PROBE_INTERVAL):
+        self.failure_threshold = failure_threshold
+        self.base_probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_interval = probe_interval
+        self.next_probe_at = None
+        self.opened_at = None
+
+    def is_open(self):
+        return self.state == OPEN
+
+    def probe_due(self):
+        return self.state == OPEN and time.monotonic() >= self.next_probe_at
+
+    def record_success(self):
+        # Returns True when this success closed an open breaker
+        was_open = self.state == OPEN
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_interval = self.base_probe_interval
+        self.next_probe_at = None
+        self.opened_at = None
+        return was_open
+
+    def record_failure(self):
+        # Returns True when this failure opened the breaker
+        if self.state == OPEN:
+            self.probe_interval = min(self.probe_interval * 2, self.max_probe_interval)
+            self.next_probe_at = time.monotonic() + self.probe_interval
+            return False
+
+        self.failures += 1
+        if self.failures < self.failure_threshold:
+            return False
+
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_interval = self.base_probe_interval
+        self.next_probe_at = self.opened_at + self.probe_interval
+        return True
+
+# One breaker per router IP
+breakers = {}
+
+def get_breaker(host):
+    if host not in breakers:
+        breakers[host] = CircuitBreaker()
+    return breakers[host]
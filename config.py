@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN: str = os.getenv('TELEGRAM_BOT_TOKEN', '')
+TELEGRAM_API_BASE_URL: str = os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot')
 SNMP_COMMUNITY: str = os.getenv('snmp_community', '')
 SNMP_PORT: int = os.getenv('SNMP_PORT', '')
 
@@ -12,7 +13,66 @@ INTERFACE_NAME_OID = "1.3.6.1.2.1.2.2.1.2"      # ifDescr - Interface descriptio
 INTERFACE_STATUS_OID = "1.3.6.1.2.1.2.2.1.8"    # ifOperStatus - Interface operational status
 INTERFACE_IP_OID = "1.3.6.1.2.1.4.20.1.2"       # ipAdEntAddr - IP addresses
 INTERFACE_IP_INDEX_OID = "1.3.6.1.2.1.4.20.1.2"  # ipAdEntIfIndex - Interface index for IP
+INTERFACE_IP_MASK_OID = "1.3.6.1.2.1.4.20.1.3"   # ipAdEntNetMask - Subnet mask for IP
 SYSUPTIME = "1.3.6.1.2.1.1.3.0"
+IF_NUMBER_OID = "1.3.6.1.2.1.2.1.0"             # ifNumber - Number of interfaces
+INTERFACE_TYPE_OID = "1.3.6.1.2.1.2.2.1.3"      # ifType - IANA interface type
+INTERFACE_ADMIN_STATUS_OID = "1.3.6.1.2.1.2.2.1.7"  # ifAdminStatus - Interface administrative status
+
+# SNMP request timing; POLL_DEADLINE bounds one monitor poll cycle
+SNMP_TIMEOUT: float = float(os.getenv('SNMP_TIMEOUT', '1.0'))
+SNMP_RETRIES: int = int(os.getenv('SNMP_RETRIES', '5'))
+POLL_DEADLINE: float = float(os.getenv('POLL_DEADLINE', '5.0'))
+# Budget for learning a router's interface set; an unfinished walk resumes next cycle
+SNMP_LEARN_DEADLINE: float = float(os.getenv('SNMP_LEARN_DEADLINE', '30.0'))
+
+# SNMP request sizing
+SNMP_MAX_PDU_SIZE: int = int(os.getenv('SNMP_MAX_PDU_SIZE', '1400'))
+SNMP_GET_WORKERS: int = int(os.getenv('SNMP_GET_WORKERS', '4'))
+SNMP_BULK_REPETITIONS: int = int(os.getenv('SNMP_BULK_REPETITIONS', '25'))
+SNMP_COALESCE_WINDOW: float = float(os.getenv('SNMP_COALESCE_WINDOW', '2.0'))
+MONITOR_INTERFACE_INDEXES: list = [i.strip() for i in os.getenv('MONITOR_INTERFACE_INDEXES', '').split(',') if i.strip()]
+
+# Interface selection, evaluated once per walk against ifDescr/ifType/ifAdminStatus.
+# Excluded interfaces are never polled.
+INTERFACE_INCLUDE_TYPES: list = [t.strip() for t in os.getenv('INTERFACE_INCLUDE_TYPES', '').split(',') if t.strip()]
+INTERFACE_EXCLUDE_TYPES: list = [t.strip() for t in os.getenv('INTERFACE_EXCLUDE_TYPES', '').split(',') if t.strip()]
+INTERFACE_INCLUDE_NAME_REGEX: str = os.getenv('INTERFACE_INCLUDE_NAME_REGEX', '')
+INTERFACE_EXCLUDE_NAME_REGEX: str = os.getenv('INTERFACE_EXCLUDE_NAME_REGEX', r'^(lo|null|voi)')
+INTERFACE_SKIP_ADMIN_DOWN: bool = os.getenv('INTERFACE_SKIP_ADMIN_DOWN', 'false').lower() in ('1', 'true', 'yes')
+# Seconds between ifAdminStatus checks of skipped admin-down interfaces
+INTERFACE_ADMIN_RECHECK_INTERVAL: float = float(os.getenv('INTERFACE_ADMIN_RECHECK_INTERVAL', '300'))
+# Extra name abbreviations as "Prefix=Short,Prefix=Short"
+INTERFACE_ABBREVIATIONS: dict = dict(
+    pair.split('=', 1) for pair in os.getenv('INTERFACE_ABBREVIATIONS', '').split(',') if '=' in pair
+)
+
+# Per-device circuit breaker
+BREAKER_FAILURE_THRESHOLD: int = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '3'))
+BREAKER_PROBE_INTERVAL: float = float(os.getenv('BREAKER_PROBE_INTERVAL', '5'))
+BREAKER_MAX_PROBE_INTERVAL: float = float(os.getenv('BREAKER_MAX_PROBE_INTERVAL', '300'))
+
+# Progressive status table: minimum seconds between edits of the same message
+STATUS_STREAM_EDIT_INTERVAL: float = float(os.getenv('STATUS_STREAM_EDIT_INTERVAL', '1.0'))
+
+# Paginated status view
+STATUS_PAGE_SIZE: int = int(os.getenv('STATUS_PAGE_SIZE', '20'))
+STATUS_SNAPSHOT_TTL: float = float(os.getenv('STATUS_SNAPSHOT_TTL', '60'))
+
+# Seconds between fleet index rebuilds of a monitored router's addresses
+FLEET_INDEX_REFRESH_INTERVAL: float = float(os.getenv('FLEET_INDEX_REFRESH_INTERVAL', '300'))
+# Seconds before retrying after an inventory walk that did not complete
+FLEET_INDEX_RETRY_INTERVAL: float = float(os.getenv('FLEET_INDEX_RETRY_INTERVAL', '30'))
+
+# Sharding across bot instances. With a store path set, instances that share
+# it split the routers between them so each one is polled and alerted on once.
+COORDINATION_STORE: str = os.getenv('COORDINATION_STORE', '')
+INSTANCE_ID: str = os.getenv('INSTANCE_ID', '')
+COORDINATION_HEARTBEAT_INTERVAL: float = float(os.getenv('COORDINATION_HEARTBEAT_INTERVAL', '5'))
+COORDINATION_LEASE_TTL: float = float(os.getenv('COORDINATION_LEASE_TTL', '15'))
+COORDINATION_RING_REPLICAS: int = int(os.getenv('COORDINATION_RING_REPLICAS', '64'))
 
 LOG_FORMAT: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
+# Identical log messages within this many seconds are collapsed into one
+LOG_DEDUP_WINDOW: float = float(os.getenv('LOG_DEDUP_WINDOW', '60'))
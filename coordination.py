@@ -0,0 +1,227 @@
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from config import *
+
+logger = logging.getLogger(__name__)
+
+class CoordinationStore(ABC):
+    # Shared state between bot instances. Times are wall-clock seconds, so
+    # instances sharing a store must share a clock (same host or NTP synced).
+    @abstractmethod
+    def heartbeat(self, instance_id, now, devices):
+        # Marks the instance alive and replaces the set of devices it watches
+        pass
+
+    @abstractmethod
+    def live_watchers(self, since):
+        # {device: [instance ids]} over instances heard from since `since`
+        pass
+
+    @abstractmethod
+    def leave(self, instance_id):
+        # Drops the instance's heartbeat, watched devices and every lease it holds
+        pass
+
+    @abstractmethod
+    def acquire_lease(self, device, owner, now, ttl):
+        # Atomically takes or renews the lease; False while someone else holds it
+        pass
+
+    @abstractmethod
+    def release_lease(self, device, owner):
+        pass
+
+class SQLiteStore(CoordinationStore):
+    # Single-file backend, enough for instances on one host or a shared volume
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS instances (instance_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS watches (instance_id TEXT NOT NULL, device TEXT NOT NULL, "
+                "PRIMARY KEY (instance_id, device))"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS leases (device TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def _connect(self):
+        # A connection per call keeps the store usable from any thread;
+        # autocommit unless a method opens its own transaction
+        return closing(sqlite3.connect(self.path, timeout=5, isolation_level=None))
+
+    def heartbeat(self, instance_id, now, devices):
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "INSERT INTO instances VALUES (?, ?) "
+                "ON CONFLICT(instance_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (instance_id, now)
+            )
+            db.execute("DELETE FROM watches WHERE instance_id = ?", (instance_id,))
+            db.executemany("INSERT INTO watches VALUES (?, ?)", [(instance_id, device) for device in devices])
+            db.execute("COMMIT")
+
+    def live_watchers(self, since):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT watches.device, watches.instance_id FROM watches "
+                "JOIN instances ON instances.instance_id = watches.instance_id "
+                "WHERE instances.heartbeat >= ?",
+                (since,)
+            ).fetchall()
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "DELETE FROM watches WHERE instance_id IN "
+                "(SELECT instance_id FROM instances WHERE heartbeat < ?)",
+                (since,)
+            )
+            db.execute("DELETE FROM instances WHERE heartbeat < ?", (since,))
+            db.execute("COMMIT")
+
+        watchers = {}
+        for device, instance_id in rows:
+            watchers.setdefault(device, []).append(instance_id)
+        return watchers
+
+    def leave(self, instance_id):
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM instances WHERE instance_id = ?", (instance_id,))
+            db.execute("DELETE FROM watches WHERE instance_id = ?", (instance_id,))
+            db.execute("DELETE FROM leases WHERE owner = ?", (instance_id,))
+            db.execute("COMMIT")
+
+    def acquire_lease(self, device, owner, now, ttl):
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) "
+                "ON CONFLICT(device) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.owner = excluded.owner OR leases.expires < ?",
+                (device, owner, now + ttl, now)
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, device, owner):
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE device = ? AND owner = ?", (device, owner))
+
+class HashRing:
+    # Consistent hashing with virtual nodes: when an instance joins or leaves
+    # only the devices on its arcs of the ring move
+    def __init__(self, members, replicas=COORDINATION_RING_REPLICAS):
+        self.members = sorted(members)
+        self._ring = sorted(
+            (self._hash(f"{member}#{replica}"), member)
+            for member in self.members for replica in range(replicas)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def owner(self, key):
+        if not self._ring:
+            return None
+        position = bisect.bisect(self._points, self._hash(key)) % len(self._ring)
+        return self._ring[position][1]
+
+class Coordinator:
+    # A device is polled and alerted on only by the instance holding its lease.
+    # Every heartbeat the instance publishes the devices it watches, and each
+    # device's owner is picked on a hash ring of the live instances watching
+    # that device, so a device is never assigned to an instance that does not
+    # poll it. The instance renews leases for devices it owns and releases the
+    # rest. When an instance dies its heartbeat and leases expire and the
+    # remaining watchers pick its devices up.
+    def __init__(self, store, instance_id=None, heartbeat_interval=COORDINATION_HEARTBEAT_INTERVAL,
+                 lease_ttl=COORDINATION_LEASE_TTL):
+        self.store = store
+        self.instance_id = instance_id or INSTANCE_ID or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_ttl = lease_ttl
+        self._rings = {}   # sorted watcher tuple -> HashRing
+        self._watchers = {}  # device -> watchers seen on the last heartbeat
+        self._leases = {}  # device -> local expiry of our lease
+        self._devices = set()
+        self._next_heartbeat = 0.0
+        self._lock = threading.Lock()
+
+    def owner(self, device, watchers):
+        members = tuple(sorted(watchers))
+        ring = self._rings.get(members)
+        if ring is None:
+            ring = self._rings[members] = HashRing(members)
+        return ring.owner(device)
+
+    def tick(self, devices):
+        # Blocking store I/O, call it off the event loop
+        devices = set(devices)
+        now = time.time()
+        with self._lock:
+            if now < self._next_heartbeat and devices == self._devices:
+                return self.owned_devices()
+            self._devices = devices
+            self._next_heartbeat = now + self.heartbeat_interval
+
+            self.store.heartbeat(self.instance_id, now, devices)
+            live = self.store.live_watchers(now - self.lease_ttl)
+
+            watchers = {}
+            for device in devices:
+                # Our own heartbeat was just written, but never depend on reading it back
+                watchers[device] = tuple(sorted(set(live.get(device, ())) | {self.instance_id}))
+                if watchers[device] != self._watchers.get(device):
+                    logger.info(f"Router {device} watched by {len(watchers[device])} live instance(s), rebalancing")
+            self._watchers = watchers
+            self._rings = {members: ring for members, ring in self._rings.items() if members in watchers.values()}
+
+            for device in devices:
+                owner = self.owner(device, watchers[device])
+                if owner == self.instance_id:
+                    if self.store.acquire_lease(device, self.instance_id, now, self.lease_ttl):
+                        if device not in self._leases:
+                            logger.info(f"Instance {self.instance_id} took over router {device}")
+                        self._leases[device] = now + self.lease_ttl
+                    else:
+                        # Previous owner has not let go yet, retry soon
+                        self._leases.pop(device, None)
+                        self._next_heartbeat = now + min(1.0, self.heartbeat_interval)
+                elif self._drop(device):
+                    logger.info(f"Instance {self.instance_id} handed router {device} over to {owner}")
+
+            for device in set(self._leases) - devices:
+                self._drop(device)
+
+            return self.owned_devices()
+
+    def _drop(self, device):
+        if self._leases.pop(device, None) is None:
+            return False
+        self.store.release_lease(device, self.instance_id)
+        return True
+
+    def owns(self, device):
+        expires = self._leases.get(device)
+        return expires is not None and time.time() < expires
+
+    def owned_devices(self):
+        return {device for device in self._leases if self.owns(device)}
+
+    def leave(self):
+        with self._lock:
+            self._leases.clear()
+            self._watchers = {}
+            self._devices = set()
+            self._next_heartbeat = 0.0
+            self.store.leave(self.instance_id)
+
+# Without a shared store this instance owns every device, as before sharding
+coordinator = Coordinator(SQLiteStore(COORDINATION_STORE)) if COORDINATION_STORE else None
@@ -0,0 +1,139 @@
+import bisect
+import ipaddress
+import threading
+from snmp_manager import get_simplified_interface_name
+
+class FleetIndex:
+    # Inverted index over every router's interfaces, answering "where is this
+    # IP / subnet / interface name" without querying any device. Each poll
+    # replaces only the entries of the router it came from.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._interfaces = {}     # (device, ifIndex) -> interface entry
+        self._device_keys = {}    # device -> set of (device, ifIndex)
+        self._by_address = {}     # "10.0.0.1" -> set of keys
+        self._by_network = {}     # prefix length -> {network as int -> set of keys}
+        self._by_name = {}        # lowercased full or short name -> set of keys
+        self._sorted_names = None # rebuilt lazily for prefix searches
+
+    def update_device(self, device, interfaces):
+        # interfaces: iterable of {'index', 'name', 'addresses': [(ip, netmask)]}
+        entries = {}
+        for interface in interfaces:
+            addresses = []
+            for ip, netmask in interface.get('addresses', []):
+                try:
+                    network = ipaddress.ip_network(f"{ip}/{netmask}", strict=False)
+                except ValueError:
+                    network = ipaddress.ip_network(f"{ip}/32")
+                addresses.append((ip, network))
+            entries[(device, str(interface['index']))] = {
+                'device': device,
+                'index': str(interface['index']),
+                'name': interface['name'],
+                'addresses': addresses
+            }
+
+        with self._lock:
+            self._remove_device(device)
+            for key, entry in entries.items():
+                self._add(key, entry)
+            self._sorted_names = None
+
+    def remove_device(self, device):
+        with self._lock:
+            self._remove_device(device)
+            self._sorted_names = None
+
+    def _add(self, key, entry):
+        self._interfaces[key] = entry
+        self._device_keys.setdefault(entry['device'], set()).add(key)
+        for name in {entry['name'].lower(), get_simplified_interface_name(entry['name']).lower()}:
+            self._by_name.setdefault(name, set()).add(key)
+        for ip, network in entry['addresses']:
+            self._by_address.setdefault(ip, set()).add(key)
+            networks = self._by_network.setdefault(network.prefixlen, {})
+            networks.setdefault(int(network.network_address), set()).add(key)
+
+    def _discard(self, mapping, value, key):
+        keys = mapping.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del mapping[value]
+
+    def _remove_device(self, device):
+        for key in self._device_keys.pop(device, set()):
+            entry = self._interfaces.pop(key)
+            for name in {entry['name'].lower(), get_simplified_interface_name(entry['name']).lower()}:
+                self._discard(self._by_name, name, key)
+            for ip, network in entry['addresses']:
+                self._discard(self._by_address, ip, key)
+                networks = self._by_network.get(network.prefixlen, {})
+                self._discard(networks, int(network.network_address), key)
+                if not networks:
+                    self._by_network.pop(network.prefixlen, None)
+
+    def _entries(self, keys):
+        return sorted(
+            (dict(self._interfaces[key]) for key in keys),
+            key=lambda entry: (entry['device'], entry['name'])
+        )
+
+    def lookup(self, query, limit=20):
+        # Returns (match kind, interfaces); kind is 'address', 'subnet',
+        # 'network', 'name', 'name prefix' or None
+        query = query.strip()
+        try:
+            return self.lookup_address(ipaddress.ip_address(query))
+        except ValueError:
+            pass
+        if '/' in query:
+            try:
+                return self.lookup_network(ipaddress.ip_network(query, strict=False))
+            except ValueError:
+                pass
+        return self.lookup_name(query, limit)
+
+    def lookup_address(self, address):
+        with self._lock:
+            keys = self._by_address.get(str(address))
+            if keys:
+                return 'address', self._entries(keys)
+
+            # Longest prefix match, at most one dict lookup per prefix length
+            for prefixlen in sorted(self._by_network, reverse=True):
+                network = ipaddress.ip_network(f"{address}/{prefixlen}", strict=False)
+                keys = self._by_network[prefixlen].get(int(network.network_address))
+                if keys:
+                    return 'subnet', self._entries(keys)
+        return None, []
+
+    def lookup_network(self, network):
+        with self._lock:
+            keys = self._by_network.get(network.prefixlen, {}).get(int(network.network_address))
+            if keys:
+                return 'network', self._entries(keys)
+        return None, []
+
+    def lookup_name(self, name, limit=20):
+        name = name.lower()
+        with self._lock:
+            keys = self._by_name.get(name)
+            if keys:
+                return 'name', self._entries(keys)
+
+            if self._sorted_names is None:
+                self._sorted_names = sorted(self._by_name)
+            keys = set()
+            position = bisect.bisect_left(self._sorted_names, name)
+            while position < len(self._sorted_names) and self._sorted_names[position].startswith(name):
+                keys.update(self._by_name[self._sorted_names[position]])
+                if len(keys) >= limit:
+                    break
+                position += 1
+            if keys:
+                return 'name prefix', self._entries(keys)[:limit]
+        return None, []
+
+fleet_index = FleetIndex()
@@ -0,0 +1,66 @@
+import re
+from config import *
+
+class InterfaceFilter:
+    # Include/exclude rules on ifType, ifDescr and ifAdminStatus, compiled once.
+    # An interface is kept when it passes every include rule that is set and
+    # matches none of the exclude rules.
+    def __init__(self, include_types=(), exclude_types=(), include_name=None,
+                 exclude_name=None, skip_admin_down=False):
+        self.include_types = {str(t) for t in include_types}
+        self.exclude_types = {str(t) for t in exclude_types}
+        self.include_name = re.compile(include_name, re.IGNORECASE) if include_name else None
+        self.exclude_name = re.compile(exclude_name, re.IGNORECASE) if exclude_name else None
+        self.skip_admin_down = skip_admin_down
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            include_types=INTERFACE_INCLUDE_TYPES,
+            exclude_types=INTERFACE_EXCLUDE_TYPES,
+            include_name=INTERFACE_INCLUDE_NAME_REGEX,
+            exclude_name=INTERFACE_EXCLUDE_NAME_REGEX,
+            skip_admin_down=INTERFACE_SKIP_ADMIN_DOWN
+        )
+
+    @property
+    def needs_type(self):
+        return bool(self.include_types or self.exclude_types)
+
+    @property
+    def needs_admin_status(self):
+        return self.skip_admin_down
+
+    def metadata_oids(self):
+        # Columns that have to be walked next to ifDescr to evaluate the rules
+        oids = []
+        if self.needs_type:
+            oids.append(INTERFACE_TYPE_OID)
+        if self.needs_admin_status:
+            oids.append(INTERFACE_ADMIN_STATUS_OID)
+        return oids
+
+    def matches(self, name, if_type=None, admin_status=None):
+        if self.include_name is not None and not self.include_name.search(name):
+            return False
+        if self.exclude_name is not None and self.exclude_name.search(name):
+            return False
+        # An unknown type (walk cut short or failed) cannot satisfy an include rule
+        if self.include_types and if_type not in self.include_types:
+            return False
+        if if_type is not None and if_type in self.exclude_types:
+            return False
+        # ifAdminStatus 2 = down
+        if self.skip_admin_down and admin_status == "2":
+            return False
+        return True
+
+    def select(self, interface_names, interface_types=None, interface_admin=None):
+        interface_types = interface_types or {}
+        interface_admin = interface_admin or {}
+        return {
+            index: name for index, name in interface_names.items()
+            if self.matches(name, interface_types.get(index), interface_admin.get(index))
+        }
+
+default_interface_filter = InterfaceFilter.from_config()
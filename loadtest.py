@@ -0,0 +1,341 @@
+# loadtest.py - Replays synthetic Telegram updates against the bot handlers
+#
+# The Application is built exactly as in main(), but pointed at a local fake
+# Bot API server and backed by a simulated SNMP device, so handler throughput
+# and latency can be measured without Telegram or a router.
+#
+#   python loadtest.py --updates 5000 --concurrency 100 --users 200
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from telegram import Update
+from config import *
+from log_pipeline import setup_logging, stop_logging
+from main import build_application
+from snmp_manager import CiscoSNMPManager, WalkRow, TableRow
+
+LOADTEST_TOKEN = "123456:LOADTEST"
+
+class FakeBotAPI:
+    # Answers Bot API methods with well-formed results and counts every call
+    def __init__(self, host="127.0.0.1", port=0):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._message_ids = itertools.count(100000)
+        self.server = ThreadingHTTPServer((host, port), _FakeBotAPIHandler)
+        self.server.daemon_threads = True
+        self.server.api = self
+        self.base_url = f"http://{host}:{self.server.server_address[1]}/bot"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _message(self, params):
+        with self._lock:
+            message_id = int(params.get('message_id') or next(self._message_ids))
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': int(params.get('chat_id') or 0), 'type': 'private'},
+            'text': params.get('text', '')
+        }
+
+    def handle(self, method, params):
+        with self._lock:
+            self.calls[method] += 1
+
+        if method == 'getMe':
+            return {'id': 123456, 'is_bot': True, 'first_name': 'LoadTest', 'username': 'loadtest_bot'}
+        if method in ('sendMessage', 'editMessageText', 'editMessageReplyMarkup'):
+            return self._message(params)
+        if method == 'getUpdates':
+            return []
+        return True
+
+class _FakeBotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+        content_type = self.headers.get('Content-Type', '')
+        if not body:
+            params = {}
+        elif content_type.startswith('application/json'):
+            params = json.loads(body)
+        else:
+            params = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+        method = self.path.rstrip('/').rsplit('/', 1)[-1]
+        payload = json.dumps({'ok': True, 'result': self.server.api.handle(method, params)}).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST
+
+    def log_message(self, format, *args):
+        pass
+
+class SimulatedSNMPManager(CiscoSNMPManager):
+    # Serves a synthetic interface table from memory; every SNMP request costs
+    # `latency` seconds so coalescing and caching show up in the numbers
+    def __init__(self, interfaces=48, latency=0.005, down_every=7, ip_every=4):
+        super().__init__("192.0.2.1", "public", 161)
+        self.latency = latency
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        indexes = [(i,) for i in range(1, interfaces + 1)]
+        self.columns = {
+            INTERFACE_NAME_OID: {index: f"GigabitEthernet0/{index[0]}" for index in indexes},
+            INTERFACE_STATUS_OID: {index: "2" if index[0] % down_every == 0 else "1" for index in indexes},
+            INTERFACE_TYPE_OID: {index: "6" for index in indexes},
+            INTERFACE_ADMIN_STATUS_OID: {index: "1" for index in indexes},
+            INTERFACE_IP_INDEX_OID: {
+                (10, 0, index[0] // 256, index[0] % 256): str(index[0])
+                for index in indexes if index[0] % ip_every == 0
+            }
+        }
+        self.columns[INTERFACE_IP_MASK_OID] = {
+            index: "255.255.255.0" for index in self.columns[INTERFACE_IP_INDEX_OID]
+        }
+
+    def _count_request(self):
+        with self._requests_lock:
+            self.requests += 1
+
+    def _iter_walk_rows(self, oid, deadline=None, after=None):
+        self._count_request()
+        time.sleep(self.latency)
+        for index, value in sorted(self.columns.get(oid, {}).items()):
+            if after is None or index > tuple(after):
+                yield WalkRow(index, value)
+        return True
+
+    def snmp_get(self, oids, deadline=None):
+        self._count_request()
+        time.sleep(self.latency)
+        results = {}
+        for oid in oids:
+            if oid == IF_NUMBER_OID:
+                results[oid] = str(len(self.columns[INTERFACE_NAME_OID]))
+            else:
+                column, _, index = oid.rpartition('.')
+                results[oid] = self.columns.get(column, {}).get((int(index),))
+        return results
+
+    def snmp_SYSUPTIME(self):
+        self._count_request()
+        time.sleep(self.latency)
+        return True, "1 day, 0:00:00.00"
+
+    async def snmp_walk_table_stream(self, *oids, max_repetitions=SNMP_BULK_REPETITIONS):
+        indexes = sorted(set().union(*(self.columns.get(oid, {}) for oid in oids)))
+        for start in range(0, len(indexes), max_repetitions):
+            self._count_request()
+            await asyncio.sleep(self.latency)
+            for index in indexes[start:start + max_repetitions]:
+                yield TableRow(index, tuple(self.columns.get(oid, {}).get(index) for oid in oids))
+
+# (kind, weight) of the synthetic traffic mix
+UPDATE_MIX = [
+    ('/start', 2),
+    ('/status', 1),
+    ('/find', 1),
+    ('show_status', 4),
+    ('status_page:next', 3),
+    ('status_page:prev', 1),
+    ('status_filter:down', 2),
+    ('status_filter:ip', 1),
+    ('status_refresh', 1),
+    ('set_router_ip', 1),
+    ('ip_entry', 1),
+    ('cancel_set_ip', 1),
+    ('/unknown', 1)
+]
+
+def build_updates(count, users, devices=4, seed=1):
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in UPDATE_MIX]
+    weights = [weight for _, weight in UPDATE_MIX]
+    now = int(time.time())
+
+    for update_id in range(1, count + 1):
+        user_id = rng.randrange(users) + 1
+        user = {'id': user_id, 'is_bot': False, 'first_name': f"user{user_id}"}
+        chat = {'id': user_id, 'type': 'private'}
+        kind = rng.choices(kinds, weights)[0]
+
+        if kind.startswith('/') or kind == 'ip_entry':
+            text = f"192.0.2.{rng.randrange(devices) + 1}" if kind == 'ip_entry' else kind
+            if kind == '/find':
+                text = f"{kind} {rng.choice(['10.0.0.4', '10.0.0.77', 'Gi0/8', 'gi'])}"
+            message = {'message_id': update_id, 'date': now, 'chat': chat, 'from': user, 'text': text}
+            if kind.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(kind)}]
+            yield kind, {'update_id': update_id, 'message': message}
+        else:
+            yield kind, {
+                'update_id': update_id,
+                'callback_query': {
+                    'id': str(update_id),
+                    'from': user,
+                    'chat_instance': str(user_id),
+                    'data': kind,
+                    'message': {
+                        'message_id': 1000 + user_id,
+                        'date': now,
+                        'chat': chat,
+                        'text': "Choose an option:",
+                        'from': {'id': 123456, 'is_bot': True, 'first_name': 'LoadTest'}
+                    }
+                }
+            }
+
+class _ErrorCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+async def run_load_test(updates=2000, concurrency=50, users=100, interfaces=48, snmp_latency=0.005, seed=1):
+    api = FakeBotAPI()
+    api.start()
+    snmp_manager = SimulatedSNMPManager(interfaces=interfaces, latency=snmp_latency)
+    application = build_application(snmp_manager, token=LOADTEST_TOKEN, base_url=api.base_url)
+
+    failed_updates = set()
+
+    async def on_error(update, context):
+        if isinstance(update, Update):
+            failed_updates.add(update.update_id)
+
+    application.add_error_handler(on_error)
+    logged_errors = _ErrorCounter()
+    logging.getLogger().addHandler(logged_errors)
+
+    latencies = defaultdict(list)
+    kinds = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(kind, data):
+        async with semaphore:
+            update = Update.de_json(data, application.bot)
+            started = time.perf_counter()
+            try:
+                await application.process_update(update)
+            except Exception:
+                failed_updates.add(update.update_id)
+            latencies[kind].append(time.perf_counter() - started)
+
+    await application.initialize()
+    try:
+        jobs = []
+        for kind, data in build_updates(updates, users, seed=seed):
+            kinds[data['update_id']] = kind
+            jobs.append(run_one(kind, data))
+
+        started = time.perf_counter()
+        await asyncio.gather(*jobs)
+        elapsed = time.perf_counter() - started
+    finally:
+        await application.shutdown()
+        logging.getLogger().removeHandler(logged_errors)
+        api.stop()
+
+    errors = Counter(kinds[update_id] for update_id in failed_updates)
+    return {
+        'updates': updates,
+        'concurrency': concurrency,
+        'elapsed': elapsed,
+        'throughput': updates / elapsed if elapsed else 0.0,
+        'kinds': {
+            kind: {
+                'count': len(values),
+                'p50': _percentile(values, 50),
+                'p99': _percentile(values, 99),
+                'errors': errors.get(kind, 0)
+            }
+            for kind, values in sorted(latencies.items())
+        },
+        'all': {
+            'p50': _percentile(list(itertools.chain(*latencies.values())), 50),
+            'p99': _percentile(list(itertools.chain(*latencies.values())), 99),
+            'errors': len(failed_updates)
+        },
+        'logged_errors': logged_errors.count,
+        'bot_api_calls': dict(api.calls),
+        'snmp_requests': snmp_manager.requests
+    }
+
+def print_report(report):
+    print(f"Updates: {report['updates']} in {report['elapsed']:.2f}s "
+          f"({report['throughput']:.1f} updates/s, concurrency {report['concurrency']})")
+    print(f"{'Kind':<20} | {'Count':>6} | {'p50 ms':>8} | {'p99 ms':>8} | {'Errors':>6} | {'Error %':>7}")
+    print("-" * 70)
+    for kind, stats in report['kinds'].items():
+        error_rate = 100.0 * stats['errors'] / stats['count'] if stats['count'] else 0.0
+        print(f"{kind:<20} | {stats['count']:>6} | {stats['p50'] * 1000:>8.2f} | "
+              f"{stats['p99'] * 1000:>8.2f} | {stats['errors']:>6} | {error_rate:>6.2f}%")
+    print("-" * 70)
+    overall = report['all']
+    print(f"{'all':<20} | {report['updates']:>6} | {overall['p50'] * 1000:>8.2f} | "
+          f"{overall['p99'] * 1000:>8.2f} | {overall['errors']:>6} | "
+          f"{100.0 * overall['errors'] / max(1, report['updates']):>6.2f}%")
+    print(f"Errors logged by handlers: {report['logged_errors']}")
+    print(f"Bot API calls: {', '.join(f'{m}={n}' for m, n in sorted(report['bot_api_calls'].items()))}")
+    print(f"SNMP requests to simulated device: {report['snmp_requests']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the bot handlers against a fake Bot API")
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--interfaces', type=int, default=48)
+    parser.add_argument('--snmp-latency', type=float, default=0.005)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    setup_logging()
+    logging.getLogger().setLevel(args.log_level)
+    try:
+        report = asyncio.run(run_load_test(
+            updates=args.updates,
+            concurrency=args.concurrency,
+            users=args.users,
+            interfaces=args.interfaces,
+            snmp_latency=args.snmp_latency,
+            seed=args.seed
+        ))
+        print_report(report)
+    finally:
+        stop_logging()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from config import *
+
+# Console summaries go through their own logger so they share the
+# background writer but keep a bare message format on stdout
+console_logger = logging.getLogger("console")
+
+_listeners = []
+_filters = []  # (RateLimitFilter, the QueueHandler it sits on)
+_flush_stop = threading.Event()
+
+class RateLimitFilter(logging.Filter):
+    # Passes the first copy of a message and drops identical ones for `window`
+    # seconds. How many were dropped is reported by the next copy after the
+    # window, or by pop_expired() once the window closes without one.
+    def __init__(self, window=LOG_DEDUP_WINDOW, max_keys=1024):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                entry[2] = record
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            self._seen[key] = [now, 0, None]
+            if len(self._seen) > self.max_keys:
+                # Entries with drops not yet reported stay until they are
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window or v[1]}
+
+        if suppressed:
+            record.msg = f"{message} (suppressed {suppressed} identical messages)"
+            record.args = ()
+        return True
+
+    def pop_expired(self, force=False):
+        # One summary record per message whose window closed with drops
+        # pending; `force` takes the open windows too
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            for (_, _, message), entry in self._seen.items():
+                if not entry[1] or not (force or now - entry[0] >= self.window):
+                    continue
+                summary = logging.makeLogRecord(entry[2].__dict__)
+                summary.msg = f"{message} (suppressed {entry[1]} identical messages)"
+                summary.args = ()
+                summary.exc_info = summary.exc_text = summary.stack_info = None
+                summaries.append(summary)
+                entry[1] = 0
+                entry[2] = None
+        return summaries
+
+def _flush_suppressed(force=False):
+    for rate_filter, queue_handler in _filters:
+        for record in rate_filter.pop_expired(force):
+            # emit() skips the handler's filters, summaries are never dropped
+            queue_handler.emit(record)
+
+def _flush_loop():
+    while not _flush_stop.wait(max(LOG_DEDUP_WINDOW / 2, 1)):
+        _flush_suppressed()
+
+def _start_listener(target_logger, handler, rate_limit=True):
+    # Callers only enqueue; the listener thread does the actual writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if rate_limit:
+        rate_filter = RateLimitFilter()
+        queue_handler.addFilter(rate_filter)
+        _filters.append((rate_filter, queue_handler))
+    target_logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    _listeners.append(listener)
+
+def setup_logging():
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, LOG_LEVEL))
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _start_listener(root, log_handler)
+
+    console_logger.setLevel(logging.INFO)
+    console_logger.propagate = False
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    # The monitor already only prints on change, repeats there are meaningful
+    _start_listener(console_logger, console_handler, rate_limit=False)
+    _flush_stop.clear()
+    threading.Thread(target=_flush_loop, name="log-dedup-flush", daemon=True).start()
+
+def stop_logging():
+    # Reports pending drop counts, then flushes whatever is still queued
+    _flush_stop.set()
+    _flush_suppressed(force=True)
+    _filters.clear()
+    while _listeners:
+        _listeners.pop().stop()
@@ -5,12 +5,7 @@ from telegram.ext import Application, CommandHandler, CallbackQueryHandler, Mess
 from telegram import Update
 from config import *
 from snmp_manager import CiscoSNMPManager
-
-def setup_logging():
-    logging.basicConfig(
-        format=LOG_FORMAT,
-        level=getattr(logging, LOG_LEVEL)
-    )
+from log_pipeline import setup_logging, stop_logging
 
 def validate_configuration():
     if TELEGRAM_BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
@@ -30,7 +25,7 @@ def create_command_handlers(snmp_manager):
     from bot_handlers import (
         start_command, status_command, unknown_command,
         handle_start_monitoring, handle_stop_monitoring, handle_show_status,
-        handle_set_router_ip, handle_cancel_set_ip, handle_text
+        handle_set_router_ip, handle_cancel_set_ip, handle_text, handle_status_view
     )
     
     async def start_wrapper(update: Update, context):
@@ -64,45 +59,38 @@ def create_command_handlers(snmp_manager):
     async def callback_cancel_set_ip(update: Update, context):
         await handle_cancel_set_ip(update, context)
     
+    async def callback_status_view(update: Update, context):
+        await handle_status_view(update, context, snmp_manager)
+    
     return (start_wrapper, status_wrapper, set_wrapper, text_wrapper, unknown_command_wrapper,
             callback_start_monitoring, callback_stop_monitoring, callback_show_status,
-            callback_set_router_ip, callback_cancel_set_ip)
+            callback_set_router_ip, callback_cancel_set_ip, callback_status_view)
 
-def main() -> None:
-    # Setup logging
-    setup_logging()
-    logger = logging.getLogger(__name__)
-    
-    # Validate configuration
-    if not validate_configuration():
-        return
-    
-    # Print startup information
-    print_startup_info()
-    
-    # Initialize SNMP manager with no initial IP
-    snmp_manager = CiscoSNMPManager(None, SNMP_COMMUNITY, SNMP_PORT)
-    
-    # Create Telegram application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+def build_application(snmp_manager, token=TELEGRAM_BOT_TOKEN, base_url=TELEGRAM_API_BASE_URL):
+    # Create Telegram application; base_url can point at a local fake Bot API
+    application = Application.builder().token(token).base_url(base_url).build()
     
     # Create command handlers with dependency injection
     (start_wrapper, status_wrapper, set_wrapper, text_wrapper, unknown_command_wrapper,
      callback_start_monitoring, callback_stop_monitoring, callback_show_status,
-     callback_set_router_ip, callback_cancel_set_ip) = create_command_handlers(snmp_manager)
+     callback_set_router_ip, callback_cancel_set_ip, callback_status_view) = create_command_handlers(snmp_manager)
     
     # Import stop_command here to avoid circular import
-    from bot_handlers import stop_command
+    from bot_handlers import stop_command, find_command
     
     # Create stop wrapper
     async def stop_wrapper(update: Update, context):
         await stop_command(update, context)
     
+    async def find_wrapper(update: Update, context):
+        await find_command(update, context)
+    
     # Register command handlers
     application.add_handler(CommandHandler("start", start_wrapper))
     application.add_handler(CommandHandler("stop", stop_wrapper))
     application.add_handler(CommandHandler("status", status_wrapper))
     application.add_handler(CommandHandler("set", set_wrapper))
+    application.add_handler(CommandHandler("find", find_wrapper))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, text_wrapper))
 
     # Register callback query handlers for widget buttons
@@ -111,9 +99,29 @@ def main() -> None:
     application.add_handler(CallbackQueryHandler(callback_show_status, pattern="^show_status$"))
     application.add_handler(CallbackQueryHandler(callback_set_router_ip, pattern="^set_router_ip$"))
     application.add_handler(CallbackQueryHandler(callback_cancel_set_ip, pattern="^cancel_set_ip$"))
+    application.add_handler(CallbackQueryHandler(callback_status_view, pattern="^status_(page|filter|refresh)"))
 
     # Add handler for unknown commands
     application.add_handler(MessageHandler(filters.COMMAND, unknown_command_wrapper))
+
+    return application
+
+def main() -> None:
+    # Setup logging
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    
+    # Validate configuration
+    if not validate_configuration():
+        return
+    
+    # Print startup information
+    print_startup_info()
+    
+    # Initialize SNMP manager with no initial IP
+    snmp_manager = CiscoSNMPManager(None, SNMP_COMMUNITY, SNMP_PORT)
+    
+    application = build_application(snmp_manager)
     
     # Run the bot
     try:
@@ -129,6 +137,8 @@ def main() -> None:
         stop_monitoring()
         print(f"Bot error: {e}")
         logger.error(f"Bot error: {e}")
+    finally:
+        stop_logging()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
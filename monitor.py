@@ -1,7 +1,12 @@
 import asyncio
 import logging
+import time
 from config import *
 from snmp_manager import get_simplified_interface_name
+from circuit_breaker import get_breaker
+from log_pipeline import console_logger
+from fleet_index import fleet_index
+from coordination import coordinator
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +15,9 @@ chat_id = None
 interface_status_cache = {}
 current_snmp_manager = None
 last_monitoring_message_id = None  # Track the last monitoring message
+last_console_summary = None  # Console output is only repeated when this changes
+fleet_index_refresh = {}  # host -> (interface_set_generation indexed, next refresh time)
+fleet_index_tasks = {}  # host -> inventory refresh running in the background
 
 async def monitor_interfaces(application, snmp_manager):
     global monitoring_active, chat_id, interface_status_cache, current_snmp_manager, last_monitoring_message_id
@@ -25,15 +33,53 @@ async def monitor_interfaces(application, snmp_manager):
                 await asyncio.sleep(1)
                 continue
 
-            success, current_status = snmp_manager.get_interface_status_only()
+            if coordinator is not None:
+                await asyncio.to_thread(coordinator.tick, [snmp_manager.host])
+                if not coordinator.owns(snmp_manager.host):
+                    # Another instance polls and alerts for this router. Drop the
+                    # cache so a later takeover starts from a fresh baseline.
+                    interface_status_cache.clear()
+                    await asyncio.sleep(1)
+                    continue
+
+            breaker = get_breaker(snmp_manager.host)
+            if breaker.is_open():
+                if not breaker.probe_due():
+                    await asyncio.sleep(1)
+                    continue
+
+                # Only a cheap sysUpTime GET goes out while the device is unreachable
+                probe_ok, _ = await snmp_manager.coalesced('snmp_SYSUPTIME')
+                if not probe_ok:
+                    breaker.record_failure()
+                    logger.debug(f"Probe to {snmp_manager.host} failed, next in {breaker.probe_interval:.0f}s")
+                    await asyncio.sleep(1)
+                    continue
+
+                breaker.record_success()
+                await send_reachability_alert(application, snmp_manager.host, reachable=True)
+
+            success, current_status = await snmp_manager.coalesced(
+                'get_interface_status_only', tuple(MONITOR_INTERFACE_INDEXES) or None, POLL_DEADLINE
+            )
             
             if success:
+                breaker.record_success()
+                schedule_fleet_index_refresh(snmp_manager)
                 down_interfaces = []
                 status_changes = []
                 
                 # Check each interface
                 for index, interface_info in current_status.items():
                     interface_name = get_simplified_interface_name(interface_info['name'])
+
+                    if interface_info.get('stale'):
+                        # No reading this cycle: keep the last known state, never alert on it
+                        cached = interface_status_cache.get(index)
+                        if cached and cached['status'] == "down":
+                            down_interfaces.append(interface_name)
+                        continue
+
                     current_status_val = interface_info['status']
                     
                     if current_status_val == "down":
@@ -53,7 +99,7 @@ async def monitor_interfaces(application, snmp_manager):
 
                 print_down_interfaces_to_console(down_interfaces, snmp_manager.host)
 
-                if chat_id:
+                if chat_id and is_alert_emitter(snmp_manager.host):
                     if status_changes:  
                         alert_message = (
                             "ALERT INTERFACE STATUS CHANGE!\n\n" +
@@ -85,8 +131,16 @@ async def monitor_interfaces(application, snmp_manager):
                             logger.error(f"Failed to send initial message: {e}")
                             
 
+            elif success is None:
+                # Interface set still being learned: the router answered but
+                # there is nothing to evaluate yet, the breaker is left as is
+                pass
+
             else:
-                logger.error(f"Failed to get interface status from {snmp_manager.host}")
+                if breaker.record_failure():
+                    await send_reachability_alert(application, snmp_manager.host, reachable=False)
+                else:
+                    logger.warning(f"Failed to get interface status from {snmp_manager.host}")
 
         except Exception as e:
             logger.error(f"Monitor error: {e}")
@@ -96,23 +150,84 @@ async def monitor_interfaces(application, snmp_manager):
 
 
 
+def schedule_fleet_index_refresh(snmp_manager):
+    # Rebuilt right after the interface set changes, and every
+    # FLEET_INDEX_REFRESH_INTERVAL seconds to catch readdressed interfaces,
+    # which leave ifNumber and the targeted status polls untouched. The walk
+    # runs in the background, polling never waits for it.
+    host = snmp_manager.host
+    generation = snmp_manager.interface_set_generation
+    scheduled = fleet_index_refresh.get(host)
+    if scheduled is not None and scheduled[0] == generation and time.monotonic() < scheduled[1]:
+        return
+    task = fleet_index_tasks.get(host)
+    if task is not None and not task.done():
+        return
+    fleet_index_tasks[host] = asyncio.create_task(refresh_fleet_index(snmp_manager, host, generation))
+
+async def refresh_fleet_index(snmp_manager, host, generation):
+    try:
+        success, inventory = await snmp_manager.coalesced('get_interface_inventory', SNMP_LEARN_DEADLINE)
+    except Exception as e:
+        logger.error(f"Fleet index refresh for {host} failed: {e}")
+        success = False
+    if snmp_manager.host != host:
+        # Retargeted while walking, the rows may belong to either router
+        return
+    now = time.monotonic()
+    if success:
+        fleet_index.update_device(host, inventory)
+        fleet_index_refresh[host] = (generation, now + FLEET_INDEX_REFRESH_INTERVAL)
+        logger.info(f"Fleet index updated for {host}: {len(inventory)} interfaces")
+    else:
+        # Not on every poll: the previous entries stay until a walk completes
+        fleet_index_refresh[host] = (generation, now + FLEET_INDEX_RETRY_INTERVAL)
+
+
+def is_alert_emitter(router_ip):
+    # The lease can lapse during a slow poll, check again right before alerting
+    return coordinator is None or coordinator.owns(router_ip)
+
+
+async def send_reachability_alert(application, router_ip, reachable):
+    if reachable:
+        logger.info(f"Router {router_ip} recovered, resuming polling")
+        alert_message = f"DEVICE RECOVERED\n\nRouter: {router_ip} is reachable again, monitoring resumed."
+    else:
+        logger.error(f"Router {router_ip} unreachable, polling paused until it answers a probe")
+        alert_message = f"DEVICE UNREACHABLE\n\nRouter: {router_ip} is not answering SNMP, polling paused."
+
+    if chat_id and is_alert_emitter(router_ip):
+        try:
+            await application.bot.send_message(chat_id=chat_id, text=alert_message)
+        except Exception as e:
+            logger.error(f"Failed to send alert: {e}")
+
+
 def print_down_interfaces_to_console(down_interfaces, router_ip):
+    global last_console_summary
+
+    summary = (router_ip, tuple(down_interfaces))
+    if summary == last_console_summary:
+        return
+    last_console_summary = summary
+
     if not router_ip:
-        print("\nNO ROUTER IP SET")
+        console_logger.info("\nNO ROUTER IP SET")
         return
 
     if down_interfaces:
-        print(f"\nDOWN INTERFACES CHECK ({router_ip}) ---")
-        for interface in down_interfaces:
-            print(f"DOWN: {interface}")
-        print(f"Total: {len(down_interfaces)}")
-        print(f"---" + "-" * 45)
+        lines = [f"\nDOWN INTERFACES CHECK ({router_ip}) ---"]
+        lines.extend(f"DOWN: {interface}" for interface in down_interfaces)
+        lines.append(f"Total: {len(down_interfaces)}")
+        lines.append(f"---" + "-" * 45)
+        console_logger.info("\n".join(lines))
     else:
-        print(f"```\n--- All interfaces UP on {router_ip} ---")
+        console_logger.info(f"```\n--- All interfaces UP on {router_ip} ---")
 
 
 
-def start_monitoring(user_chat_id, snmp_manager):
+async def start_monitoring(user_chat_id, snmp_manager):
     global monitoring_active, chat_id, interface_status_cache, current_snmp_manager, last_monitoring_message_id
     
     chat_id = user_chat_id
@@ -121,19 +236,41 @@ def start_monitoring(user_chat_id, snmp_manager):
     last_monitoring_message_id = None 
     
 
-    success, status_data = snmp_manager.get_interface_status_only()
+    # Same call and arguments as the monitor loop, so the two share one poll
+    success, status_data = await snmp_manager.coalesced(
+        'get_interface_status_only', tuple(MONITOR_INTERFACE_INDEXES) or None, POLL_DEADLINE
+    )
     if success:
-        interface_status_cache = status_data
+        # The router answers now; a breaker left open by an earlier outage
+        # would otherwise keep the loop idle until its next probe
+        if get_breaker(snmp_manager.host).record_success():
+            logger.info(f"Circuit for {snmp_manager.host} closed by the initial poll")
+        # The monitor updates its cache in place, keep it apart from shared results
+        interface_status_cache = {
+            index: info for index, info in status_data.items() if not info.get('stale')
+        }
         logger.info(f"Monitoring started for {len(status_data)} interfaces on {snmp_manager.host}")
+    elif success is None:
+        # The loop carries on learning the interface set and builds the baseline
+        interface_status_cache = {}
+        logger.info(f"Monitoring started on {snmp_manager.host}, interfaces still being learned")
     else:
         logger.error(f"Failed to initialize monitoring for router {snmp_manager.host}")
     
-    return success
+    return success is not False
 
 def stop_monitoring():
-    global monitoring_active, current_snmp_manager, last_monitoring_message_id
+    global monitoring_active, current_snmp_manager, last_monitoring_message_id, last_console_summary
     monitoring_active = False
     last_monitoring_message_id = None  # Reset message tracking
+    last_console_summary = None
+    for task in fleet_index_tasks.values():
+        task.cancel()
+    fleet_index_tasks.clear()
+    if coordinator is not None:
+        # Hand this instance's routers to the others right away instead of
+        # waiting for the leases to expire
+        coordinator.leave()
     if current_snmp_manager:
         logger.info(f"Monitoring stopped for router {current_snmp_manager.host}")
     else:
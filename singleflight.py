@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+class _SharedStream:
+    # Drains one source generator into a buffer that any number of readers
+    # replay from, each at its own pace
+    def __init__(self, source):
+        self.rows = []
+        self.done = False
+        self.error = None
+        self.finished_at = None
+        self._changed = asyncio.Condition()
+        self._task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source):
+        try:
+            async for row in source:
+                self.rows.append(row)
+                async with self._changed:
+                    self._changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.finished_at = time.monotonic()
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def wait(self, seen):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.done or len(self.rows) > seen)
+
+def _succeeded(result):
+    # Failures and partial results are shared with the callers already
+    # waiting, never cached: None, or a (False/None, ...) tuple as returned
+    # by the SNMP manager
+    if result is None:
+        return False
+    if isinstance(result, tuple) and result and result[0] in (False, None):
+        return False
+    return True
+
+class SingleFlight:
+    # Identical in-flight calls share one execution; successful results stay
+    # valid for `freshness` seconds after completion so late callers reuse them too
+    def __init__(self, freshness=0.0):
+        self.freshness = freshness
+        self._in_flight = {}
+        self._results = {}
+        self._streams = {}
+        self._next_prune = 0.0
+
+    def _is_fresh(self, finished_at):
+        return finished_at is not None and time.monotonic() - finished_at < self.freshness
+
+    def _prune(self):
+        # Drops expired results and finished streams with their row buffers,
+        # at most once per freshness window
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.freshness
+        self._results = {
+            key: cached for key, cached in self._results.items() if self._is_fresh(cached[0])
+        }
+        self._streams = {
+            key: shared for key, shared in self._streams.items()
+            if not shared.done or (shared.error is None and self._is_fresh(shared.finished_at))
+        }
+
+    async def do(self, key, fn, *args):
+        self._prune()
+        cached = self._results.get(key)
+        if cached and self._is_fresh(cached[0]):
+            return cached[1]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run(key, fn, *args))
+            self._in_flight[key] = future
+        # A cancelled caller must not cancel the call the others are waiting on
+        return await asyncio.shield(future)
+
+    async def _run(self, key, fn, *args):
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn(*args)
+            else:
+                result = await asyncio.to_thread(fn, *args)
+            if _succeeded(result):
+                self._results[key] = (time.monotonic(), result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def stream(self, key, factory):
+        self._prune()
+        shared = self._streams.get(key)
+        # A failed walk is only shared with the readers that were already on it
+        if shared is None or (shared.done and (shared.error is not None or not self._is_fresh(shared.finished_at))):
+            shared = _SharedStream(factory())
+            self._streams[key] = shared
+
+        seen = 0
+        while True:
+            while seen < len(shared.rows):
+                yield shared.rows[seen]
+                seen += 1
+            if shared.done:
+                if shared.error is not None:
+                    raise shared.error
+                return
+            await shared.wait(seen)
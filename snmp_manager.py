@@ -1,58 +1,303 @@
+import asyncio
 import logging
+import threading
+import time
+from functools import lru_cache
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pysnmp.hlapi import *
+from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchInstance, NoSuchObject
+try:
+    import pysnmp.hlapi.asyncio as aiosnmp
+except AttributeError:
+    # pysnmp 4.4's asyncio API uses asyncio.coroutine, removed in Python 3.11
+    aiosnmp = None
 from config import *
+from singleflight import SingleFlight
+from interface_filter import default_interface_filter
 from dotenv import load_dotenv
 
 load_dotenv() 
 
 logger = logging.getLogger(__name__)
 
+# Bytes reserved for the message/PDU headers around the varbind list
+SNMP_PDU_OVERHEAD = 64
+
+def _estimate_varbind_size(oid, value_size=6):
+    oid_size = 0
+    for sub_id in oid.split('.')[2:]:
+        oid_size += max(1, (int(sub_id).bit_length() + 6) // 7)
+    # SEQUENCE header + OID tag/length + first two arcs packed in one byte
+    return 4 + oid_size + 1 + value_size
+
+def _estimate_pdu_size(oids):
+    return SNMP_PDU_OVERHEAD + sum(_estimate_varbind_size(oid) for oid in oids)
+
+# Walk results keyed by the full index (every sub-identifier after the column OID)
+WalkRow = namedtuple('WalkRow', ['index', 'value'])
+TableRow = namedtuple('TableRow', ['index', 'values'])
+
+def _oid_to_tuple(oid):
+    return tuple(int(sub_id) for sub_id in str(oid).strip('.').split('.'))
+
+def index_to_str(index):
+    return '.'.join(str(sub_id) for sub_id in index)
+
+def _value_to_str(value):
+    # str() of an IpAddress is its raw 4 octets, e.g. ipAdEntNetMask
+    if isinstance(value, IpAddress):
+        return value.prettyPrint()
+    return str(value)
+
+class SNMPWalkError(Exception):
+    # A streamed walk failed partway; rows already yielded are an incomplete table
+    pass
+
+class PollDeadline:
+    # Time budget for one poll cycle, shared by every SNMP request in it
+    def __init__(self, budget):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def request_budget(self, timeout, retries):
+        # Shrink timeout/retries so a single request cannot outlive the cycle
+        remaining = self.remaining()
+        timeout = max(0.1, min(timeout, remaining))
+        retries = max(0, min(retries, int(remaining / timeout) - 1))
+        return timeout, retries
+
+def format_status(status_code):
+    if status_code == "1":
+        return "up"
+    elif status_code == "2":
+        return "down"
+    elif status_code == "3":
+        return "testing"
+    return "unknown"
+
 class CiscoSNMPManager:
-    def __init__(self, host=None, community=None , port=None):
+    def __init__(self, host=None, community=None , port=None, interface_filter=None):
         self.host = host
         self.community = community or os.getenv('SNMP_COMMUNITY', '')
         self.port = port or os.getenv('SNMP_PORT', '')
+        self.interface_filter = interface_filter or default_interface_filter
+        self.max_pdu_size = SNMP_MAX_PDU_SIZE
+        self._pdu_size_lock = threading.Lock()
+        # Interface set learned by the last full walk, used for targeted GETs
+        self._known_host = None
+        self._known_interfaces = {}
+        self._if_number = None
+        # Every interface name of that walk, unfiltered, for the fleet index
+        self._interface_names = {}
+        # Selected-but-admin-down interfaces of the known set, with INTERFACE_SKIP_ADMIN_DOWN
+        self._admin_down = {}
+        self._admin_recheck_at = 0.0
+        # Columns of an interface-set walk still in progress, resumed next cycle
+        self._learning = None
+        # Bumped whenever the walk learns a new interface set, so the fleet
+        # index knows when this device's entries need rebuilding
+        self.interface_set_generation = 0
+        self._async_engine = None
+        self._engines = threading.local()
+        # Long-lived so each worker keeps its engine between polls
+        self._get_pool = ThreadPoolExecutor(max_workers=SNMP_GET_WORKERS)
+        self._flights = SingleFlight(SNMP_COALESCE_WINDOW)
     
+    async def coalesced(self, method_name, *args):
+        # Concurrent identical queries against the same router share one SNMP
+        # operation, and its result for SNMP_COALESCE_WINDOW seconds
+        key = (self.host, method_name, args)
+        return await self._flights.do(key, getattr(self, method_name), *args)
+
+    def coalesced_table_stream(self, *oids):
+        key = (self.host, 'snmp_walk_table_stream', oids)
+        return self._flights.stream(key, lambda: self.snmp_walk_table_stream(*oids))
+
+    def _engine(self):
+        # SnmpEngine setup loads MIBs and is slow; keep one per worker thread
+        engine = getattr(self._engines, 'engine', None)
+        if engine is None:
+            engine = self._engines.engine = SnmpEngine()
+        return engine
+
     def _check_host(self):
         if not self.host:
             logger.error("No router IP set. Please use the 'Set Router IP' button to configure the router IP.")
             return False
         return True
     
-    def snmp_walk(self, oid):
+    def _transport(self, deadline=None):
+        timeout, retries = SNMP_TIMEOUT, SNMP_RETRIES
+        if deadline is not None:
+            timeout, retries = deadline.request_budget(timeout, retries)
+        return UdpTransportTarget((self.host, self.port), timeout=timeout, retries=retries)
+
+    def _iter_walk_rows(self, oid, deadline=None, after=None):
+        # Yields the column's rows, starting past index `after` when resuming.
+        # The generator returns True once the column is exhausted and False
+        # when an error or the deadline cut it short.
+        if deadline is not None and deadline.expired():
+            return False
+
+        prefix = _oid_to_tuple(oid)
+        start = index_to_str(prefix + tuple(after)) if after else oid
+        # Lexicographic mode with our own prefix check, so a walk resumed
+        # mid-column does not stop at the subtree of its start OID
+        for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
+            self._engine(),
+            CommunityData(self.community),
+            self._transport(deadline),
+            ContextData(),
+            ObjectType(ObjectIdentity(start)),
+            lexicographicMode=True,
+            ignoreNonIncreasingOid=True):
+            
+            if errorIndication:
+                if deadline is not None and deadline.expired():
+                    logger.warning(f"SNMP Walk for {self.host} cut short by poll deadline")
+                else:
+                    logger.error(f"SNMP Walk Error for {self.host}: {errorIndication}")
+                return False
+            elif errorStatus:
+                logger.error(f"SNMP Walk Error for {self.host}: {errorStatus.prettyPrint()}")
+                return False
+            else:
+                for varBind in varBinds:
+                    name = _oid_to_tuple(varBind[0])
+                    if name[:len(prefix)] != prefix or isinstance(varBind[1], EndOfMibView):
+                        return True
+                    yield WalkRow(name[len(prefix):], _value_to_str(varBind[1]))
+
+            if deadline is not None and deadline.expired():
+                logger.warning(f"SNMP Walk for {self.host} cut short by poll deadline")
+                return False
+        return True
+
+    def _collect_walk(self, oid, values, deadline=None, after=None):
+        # Adds the column's rows to `values`; returns (complete, last index seen)
+        rows = self._iter_walk_rows(oid, deadline, after)
+        while True:
+            try:
+                row = next(rows)
+            except StopIteration as stop:
+                return bool(stop.value), after
+            values[index_to_str(row.index)] = row.value
+            after = row.index
+
+    def snmp_walk(self, oid, deadline=None):
         if not self._check_host():
             return {}
             
         results = {}
         try:
-            for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.host, self.port)),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
-                lexicographicMode=False,
-                ignoreNonIncreasingOid=True):
-                
-                if errorIndication:
-                    logger.error(f"SNMP Walk Error for {self.host}: {errorIndication}")
-                    break
-                elif errorStatus:
-                    logger.error(f"SNMP Walk Error for {self.host}: {errorStatus.prettyPrint()}")
-                    break
-                else:
-                    for varBind in varBinds:
-                        oid_key = str(varBind[0])
-                        value = str(varBind[1])
-                        # Extract
-                        index = oid_key.split('.')[-1]
-                        results[index] = value
+            for row in self._iter_walk_rows(oid, deadline):
+                results[index_to_str(row.index)] = row.value
                         
         except Exception as e:
             logger.error(f"SNMP Walk Exception for {self.host}: {str(e)}")
             return {}
         
         return results
+
+    async def snmp_walk_stream(self, oid, max_repetitions=SNMP_BULK_REPETITIONS):
+        async for row in self.snmp_walk_table_stream(oid, max_repetitions=max_repetitions):
+            yield WalkRow(row.index, row.values[0])
+
+    async def _bulk_request(self, oids, max_repetitions):
+        varBinds = [ObjectType(ObjectIdentity(oid)) for oid in oids]
+        if aiosnmp is None:
+            return await asyncio.to_thread(self._sync_bulk_request, varBinds, max_repetitions)
+
+        if self._async_engine is None:
+            self._async_engine = SnmpEngine()
+        return await aiosnmp.bulkCmd(
+            self._async_engine,
+            CommunityData(self.community),
+            aiosnmp.UdpTransportTarget((self.host, self.port), timeout=SNMP_TIMEOUT, retries=SNMP_RETRIES),
+            ContextData(),
+            0, max_repetitions,
+            *varBinds
+        )
+
+    def _sync_bulk_request(self, varBinds, max_repetitions):
+        # Same single GETBULK through the sync API, collected into a table
+        varBindTable = []
+        for (errorIndication, errorStatus, errorIndex, varBindRow) in bulkCmd(
+            self._engine(),
+            CommunityData(self.community),
+            self._transport(),
+            ContextData(),
+            0, max_repetitions,
+            *varBinds,
+            maxCalls=1):
+
+            if errorIndication or errorStatus:
+                return errorIndication, errorStatus, errorIndex, varBindTable
+            varBindTable.append(varBindRow)
+        return None, 0, 0, varBindTable
+
+    async def snmp_walk_table_stream(self, *oids, max_repetitions=SNMP_BULK_REPETITIONS):
+        # Walks several columns of one table in lockstep with GETBULK and yields
+        # a TableRow per index as soon as every column has moved past it. The
+        # next PDU is only requested once the consumer has drained the current
+        # one, so memory stays bounded by a single response.
+        if not self._check_host():
+            return
+
+        prefixes = [_oid_to_tuple(oid) for oid in oids]
+        cursors = list(prefixes)
+        active = [True] * len(oids)
+        pending = {}
+
+        while any(active):
+            columns = [col for col in range(len(oids)) if active[col]]
+            errorIndication, errorStatus, errorIndex, varBindTable = await self._bulk_request(
+                [index_to_str(cursors[col]) for col in columns], max_repetitions
+            )
+
+            # Raised rather than returned so consumers cannot mistake a failed
+            # walk for the end of the table
+            if errorIndication:
+                logger.error(f"SNMP Walk Error for {self.host}: {errorIndication}")
+                raise SNMPWalkError(f"SNMP walk of {self.host} failed: {errorIndication}")
+            elif errorStatus:
+                logger.error(f"SNMP Walk Error for {self.host}: {errorStatus.prettyPrint()}")
+                raise SNMPWalkError(f"SNMP walk of {self.host} failed: {errorStatus.prettyPrint()}")
+
+            if not varBindTable:
+                break
+
+            for varBinds in varBindTable:
+                for col, varBind in zip(columns, varBinds):
+                    if not active[col]:
+                        continue
+                    name = _oid_to_tuple(varBind[0])
+                    prefix = prefixes[col]
+                    if (isinstance(varBind[1], EndOfMibView) or name[:len(prefix)] != prefix
+                            or name <= cursors[col]):
+                        active[col] = False
+                        continue
+                    index = name[len(prefix):]
+                    pending.setdefault(index, [None] * len(oids))[col] = _value_to_str(varBind[1])
+                    cursors[col] = name
+
+            # An index is complete once every running column has walked past it
+            horizons = [cursors[col][len(prefixes[col]):] for col in range(len(oids)) if active[col]]
+            horizon = min(horizons) if horizons else None
+            for index in sorted(pending):
+                if horizon is not None and index > horizon:
+                    break
+                yield TableRow(index, tuple(pending.pop(index)))
+
+        for index in sorted(pending):
+            yield TableRow(index, tuple(pending.pop(index)))
     
     def snmp_walk_ip_addresses(self):
         if not self._check_host():
@@ -61,7 +306,7 @@ class CiscoSNMPManager:
         results = {}
         try:
             for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
-                SnmpEngine(),
+                self._engine(),
                 CommunityData(self.community),
                 UdpTransportTarget((self.host, self.port)),
                 ContextData(),
@@ -88,13 +333,98 @@ class CiscoSNMPManager:
         return results
     
 
+    def _split_oids_for_pdu(self, oids):
+        chunks, chunk, size = [], [], SNMP_PDU_OVERHEAD
+        for oid in oids:
+            varbind_size = _estimate_varbind_size(oid)
+            if chunk and size + varbind_size > self.max_pdu_size:
+                chunks.append(chunk)
+                chunk, size = [], SNMP_PDU_OVERHEAD
+            chunk.append(oid)
+            size += varbind_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _snmp_get_pdu(self, oids, deadline=None):
+        if deadline is not None and deadline.expired():
+            return None
+
+        errorIndication, errorStatus, errorIndex, varBinds = next(getCmd(
+            self._engine(),
+            CommunityData(self.community),
+            self._transport(deadline),
+            ContextData(),
+            *[ObjectType(ObjectIdentity(oid)) for oid in oids]
+        ))
+
+        if errorIndication:
+            if deadline is not None and deadline.expired():
+                logger.warning(f"SNMP Get for {self.host} cut short by poll deadline")
+            else:
+                logger.error(f"SNMP Get Error for {self.host}: {errorIndication}")
+            return None
+        elif errorStatus:
+            if errorStatus.prettyPrint() == 'tooBig' and len(oids) > 1:
+                # The agent's limit is below this PDU's size. Lower the shared
+                # limit to just under it (a no-op when a parallel or earlier
+                # reply already went lower), then split this request.
+                failed_size = _estimate_pdu_size(oids)
+                with self._pdu_size_lock:
+                    if failed_size <= self.max_pdu_size:
+                        self.max_pdu_size = max(SNMP_PDU_OVERHEAD * 2, failed_size - 1)
+                        logger.info(f"PDU too big for {self.host}, lowering limit to {self.max_pdu_size} bytes")
+                half = len(oids) // 2
+                first = self._snmp_get_pdu(oids[:half], deadline)
+                second = self._snmp_get_pdu(oids[half:], deadline)
+                if first is None or second is None:
+                    return first or second
+                first.update(second)
+                return first
+            logger.error(f"SNMP Get Error for {self.host}: {errorStatus.prettyPrint()}")
+            return None
+
+        results = {}
+        for varBind in varBinds:
+            value = varBind[1]
+            if isinstance(value, (NoSuchObject, NoSuchInstance, EndOfMibView)):
+                results[str(varBind[0])] = None
+            else:
+                results[str(varBind[0])] = _value_to_str(value)
+        return results
+
+    def snmp_get(self, oids, deadline=None):
+        # OIDs from PDUs that got no answer are left out of the result, None is
+        # returned only when no PDU was answered at all
+        if not self._check_host():
+            return None
+
+        try:
+            chunks = self._split_oids_for_pdu(list(oids))
+            if len(chunks) <= 1:
+                responses = [self._snmp_get_pdu(chunk, deadline) for chunk in chunks]
+            else:
+                responses = list(self._get_pool.map(lambda chunk: self._snmp_get_pdu(chunk, deadline), chunks))
+        except Exception as e:
+            logger.error(f"SNMP Get Exception for {self.host}: {str(e)}")
+            return None
+
+        if all(response is None for response in responses):
+            return None
+
+        results = {}
+        for response in responses:
+            if response is not None:
+                results.update(response)
+        return results
+
     def snmp_SYSUPTIME(self):
         if not self.host:
             return False, "Router IP not set"
 
         try:
             iterator = getCmd(
-                SnmpEngine(),
+                self._engine(),
                 CommunityData(self.community, mpModel=0),
                 UdpTransportTarget((self.host, self.port)),
                 ContextData(),
@@ -118,34 +448,15 @@ class CiscoSNMPManager:
         return False, "Unknown error"
 
     
-    def snmp_walk_ip_to_interface(self):
+    def snmp_walk_ip_to_interface(self, deadline=None):
         if not self._check_host():
             return {}
             
         results = {}
         try:
-            for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.host, self.port)),
-                ContextData(),
-                ObjectType(ObjectIdentity(INTERFACE_IP_INDEX_OID)),
-                lexicographicMode=False,
-                ignoreNonIncreasingOid=True):
-                
-                if errorIndication:
-                    logger.error(f"SNMP Walk Error for {self.host}: {errorIndication}")
-                    break
-                elif errorStatus:
-                    logger.error(f"SNMP Walk Error for {self.host}: {errorStatus.prettyPrint()}")
-                    break
-                else:
-                    for varBind in varBinds:
-                        oid_key = str(varBind[0])
-                        interface_index = str(varBind[1])
-                        # Extract IP from OID
-                        ip_address = ".".join(oid_key.split(".")[-4:])
-                        results[ip_address] = interface_index
+            for row in self._iter_walk_rows(INTERFACE_IP_INDEX_OID, deadline):
+                # ipAdEntIfIndex is indexed by the IP address itself
+                results[index_to_str(row.index)] = row.value
                         
         except Exception as e:
             logger.error(f"SNMP Walk Exception for {self.host}: {str(e)}")
@@ -153,19 +464,68 @@ class CiscoSNMPManager:
         
         return results
     
-    def get_interface_data(self):
+    def get_interface_inventory(self, budget=None):
+        # Every interface with its addresses and netmasks, unfiltered, for the
+        # fleet index. Returns (success, [{'index', 'name', 'addresses'}]).
+        # Names come from the last interface-set walk when there is one.
+        if not self._check_host():
+            return False, []
+
+        deadline = PollDeadline(budget) if budget is not None else None
+        try:
+            # The index replaces the device's entries wholesale, so a column
+            # cut short fails the whole inventory instead of shrinking it
+            columns = {}
+            if self._known_host == self.host and self._interface_names:
+                columns[INTERFACE_NAME_OID] = self._interface_names
+            for oid in (INTERFACE_NAME_OID, INTERFACE_IP_INDEX_OID, INTERFACE_IP_MASK_OID):
+                if oid in columns:
+                    continue
+                columns[oid] = {}
+                complete, _ = self._collect_walk(oid, columns[oid], deadline)
+                if not complete:
+                    logger.warning(f"Interface inventory of {self.host} incomplete, keeping the previous one")
+                    return False, []
+            interface_names = columns[INTERFACE_NAME_OID]
+            if not interface_names:
+                return False, []
+            # ipAdEntIfIndex and ipAdEntNetMask are indexed by the IP address itself
+            ip_to_interface = columns[INTERFACE_IP_INDEX_OID]
+            ip_masks = columns[INTERFACE_IP_MASK_OID]
+
+            interface_addresses = {}
+            for ip, interface_idx in ip_to_interface.items():
+                interface_addresses.setdefault(interface_idx, []).append((ip, ip_masks.get(ip, "255.255.255.255")))
+
+            return True, [
+                {'index': index, 'name': name, 'addresses': interface_addresses.get(index, [])}
+                for index, name in interface_names.items()
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting interface inventory for {self.host}: {str(e)}")
+            return False, []
+
+    def get_interface_data(self, budget=None):
         if not self._check_host():
             return False, "No router IP set. Please use the 'Set Router IP' button to configure the router IP."
             
+        deadline = PollDeadline(budget) if budget is not None else None
         try:
             # names
-            interface_names = self.snmp_walk(INTERFACE_NAME_OID)
+            interface_names = self.snmp_walk(INTERFACE_NAME_OID, deadline)
+            interface_names = self._select_interfaces(interface_names, deadline)
             
-            # status
-            interface_status = self.snmp_walk(INTERFACE_STATUS_OID)
+            # status, requested only for the selected interfaces
+            status_oids = {index: f"{INTERFACE_STATUS_OID}.{index}" for index in interface_names}
+            status_values = self.snmp_get(list(status_oids.values()), deadline) or {}
+            interface_status = {
+                index: status_values[oid] for index, oid in status_oids.items()
+                if status_values.get(oid) is not None
+            }
             
             # interface
-            ip_to_interface = self.snmp_walk_ip_to_interface()
+            ip_to_interface = self.snmp_walk_ip_to_interface(deadline)
             
             # Mapping if index to IP
             interface_ips = {}
@@ -181,28 +541,20 @@ class CiscoSNMPManager:
                 interface_name = interface_names.get(index, f"Interface{index}")
                 
                 #  Format status number
-                status_code = interface_status.get(index, "0")
-                if status_code == "1":
-                    status = "up"
-                elif status_code == "2":
-                    status = "down"
-                elif status_code == "3":
-                    status = "testing"
-                else:
-                    status = "unknown"
+                status = format_status(interface_status.get(index, "0"))
                 
                 # Get IP addresses
                 ips = interface_ips.get(index, ["No IP"])
                 ip_str = ", ".join(ips) if ips != ["No IP"] else "No IP"
                 
-                # Filter out loopback and null interfaces
-                if not interface_name.lower().startswith(('lo', 'null', 'voi')):
-                    interfaces.append({
-                        'name': interface_name,
-                        'ip': ip_str,
-                        'status': status,
-                        'index': index
-                    })
+                interfaces.append({
+                    'name': interface_name,
+                    'ip': ip_str,
+                    'status': status,
+                    'index': index,
+                    # Status walk did not reach this interface before the deadline
+                    'stale': index not in interface_status
+                })
             
             return True, interfaces
             
@@ -210,51 +562,229 @@ class CiscoSNMPManager:
             logger.error(f"Error getting interface data for {self.host}: {str(e)}")
             return False, str(e)
     
-    def get_interface_status_only(self):
+    def get_interface_status_only(self, indexes=None, budget=None):
+        # With a budget (seconds) the cycle returns whatever it has when time
+        # runs out; interfaces without a fresh reading are marked 'stale'.
+        # Success is None while the interface set is still being learned.
         if not self._check_host():
             return False, {}
             
+        deadline = PollDeadline(budget) if budget is not None else None
         try:
-            interface_names = self.snmp_walk(INTERFACE_NAME_OID)
-            interface_status = self.snmp_walk(INTERFACE_STATUS_OID)
-            
-            status_data = {}
-            for index in interface_names.keys():
-                interface_name = interface_names.get(index, f"Interface{index}")
-                
-                # Filter loopback and system interfaces
-                if not interface_name.lower().startswith(('lo', 'null', 'voi')):
-                    status_code = interface_status.get(index, "0")
-                    if status_code == "1":
-                        status = "up"
-                    elif status_code == "2":
-                        status = "down"
-                    elif status_code == "3":
-                        status = "testing"
-                    else:
-                        status = "unknown"
-                    
-                    status_data[index] = {
-                        'name': interface_name,
-                        'status': status
-                    }
-
-            return True, status_data
+            status_data = None
+            if self._known_host == self.host and self._known_interfaces:
+                success, status_data = self._poll_interface_status(indexes, deadline)
+                if status_data is None:
+                    logger.info(f"Interface set changed on {self.host}, falling back to walk")
+
+            if status_data is None:
+                success, status_data = self._walk_interface_status(indexes, deadline)
+
+            # A cycle in which every reading went stale evaluated nothing
+            if success and status_data and all(info.get('stale') for info in status_data.values()):
+                logger.warning(f"No fresh interface readings from {self.host} this cycle")
+                return False, status_data
+            return success, status_data
             
         except Exception as e:
             logger.error(f"Error getting interface status for {self.host}: {str(e)}")
             return False, {}
 
+    def _learn_interface_columns(self, deadline=None):
+        # Walks ifDescr plus the columns the filter needs. A walk cut short
+        # keeps its rows and cursor, the next cycle carries on from there.
+        # Returns ({column oid: {index: value}} once every column is complete,
+        # whether this call got any rows).
+        columns = [INTERFACE_NAME_OID] + self.interface_filter.metadata_oids()
+        learning = self._learning
+        if learning is None or learning['host'] != self.host or learning['columns'] != columns:
+            learning = self._learning = {
+                'host': self.host,
+                'columns': columns,
+                'column': 0,
+                'after': None,
+                'values': {oid: {} for oid in columns}
+            }
+
+        learned_before = sum(len(column) for column in learning['values'].values())
+        while learning['column'] < len(columns):
+            oid = columns[learning['column']]
+            complete, learning['after'] = self._collect_walk(
+                oid, learning['values'][oid], deadline, learning['after']
+            )
+            if not complete:
+                learned = sum(len(column) for column in learning['values'].values())
+                if learned == learned_before:
+                    return None, False
+                logger.info(f"Learning interfaces on {self.host}: {learned} rows so far, resuming next cycle")
+                return None, True
+            learning['column'] += 1
+            learning['after'] = None
+
+        return learning['values'], True
+
+    def _select_interfaces(self, interface_names, deadline=None):
+        # Only walks ifType/ifAdminStatus when a rule needs them
+        interface_filter = self.interface_filter
+        interface_types = self.snmp_walk(INTERFACE_TYPE_OID, deadline) if interface_filter.needs_type else {}
+        interface_admin = self.snmp_walk(INTERFACE_ADMIN_STATUS_OID, deadline) if interface_filter.needs_admin_status else {}
+        return interface_filter.select(interface_names, interface_types, interface_admin)
+
+    def _walk_interface_status(self, indexes=None, deadline=None):
+        # Learning the interface set gets its own budget, a full ifDescr walk
+        # of a big chassis does not fit in a routine poll
+        learn_deadline = PollDeadline(SNMP_LEARN_DEADLINE) if deadline is not None else None
+        columns, progressed = self._learn_interface_columns(learn_deadline)
+        if columns is None:
+            # Still learning is no verdict on the device, only a walk that got
+            # nothing back counts as a failure
+            return (None if progressed else False), {}
+        interface_names = columns[INTERFACE_NAME_OID]
+        if not interface_names:
+            # Every agent reports at least one interface, an empty walk means it failed
+            self._learning = None
+            return False, {}
+        interface_types = columns.get(INTERFACE_TYPE_OID)
+        interfaces = self.interface_filter.select(
+            interface_names, interface_types, columns.get(INTERFACE_ADMIN_STATUS_OID)
+        )
+        # Interfaces left out only for being admin down, rechecked on a timer
+        admin_down = {
+            index: name for index, name in self.interface_filter.select(interface_names, interface_types).items()
+            if index not in interfaces
+        }
+        if deadline is not None:
+            # The status read that follows gets a routine poll's budget
+            deadline = PollDeadline(deadline.budget)
+
+        # Status is only ever requested for the selected interfaces
+        wanted = [index for index in interfaces if indexes is None or index in indexes]
+        status_data, if_number, _ = self._read_interface_status(interfaces, wanted, deadline)
+        if status_data is None:
+            status_data = {
+                index: {'name': interfaces[index], 'status': "unknown", 'stale': True}
+                for index in wanted
+            }
+
+        # Remember the interface set so the next polls can use targeted GETs.
+        # Without ifNumber the learned columns are kept and only the read is retried.
+        if if_number is not None:
+            self._known_host = self.host
+            self._known_interfaces = interfaces
+            self._interface_names = interface_names
+            self._if_number = if_number
+            self._admin_down = admin_down
+            self._admin_recheck_at = time.monotonic() + INTERFACE_ADMIN_RECHECK_INTERVAL
+            self._learning = None
+            self.interface_set_generation += 1
+
+        return True, status_data
+
+    def _poll_interface_status(self, indexes=None, deadline=None):
+        # Returns (success, None) when the interface set no longer matches the walk
+        # New interfaces are detected through ifNumber, unknown indexes are skipped
+        if self._admin_down and time.monotonic() >= self._admin_recheck_at:
+            self._recheck_admin_down(deadline)
+
+        if indexes is None:
+            wanted = list(self._known_interfaces)
+        else:
+            wanted = [index for index in indexes if index in self._known_interfaces]
+
+        status_data, if_number, vanished = self._read_interface_status(self._known_interfaces, wanted, deadline)
+        if status_data is None:
+            return False, {}
+
+        # ifNumber is missing when its PDU went unanswered, skip the check then
+        if vanished or (if_number is not None and if_number != self._if_number):
+            return True, None
+
+        return True, status_data
+
+    def _recheck_admin_down(self, deadline=None):
+        # Brings interfaces that were admin down at learning time into the
+        # polled set once they are enabled, without walking ifDescr again
+        oids = {index: f"{INTERFACE_ADMIN_STATUS_OID}.{index}" for index in self._admin_down}
+        values = self.snmp_get(list(oids.values()), deadline)
+        if values is None:
+            return
+        self._admin_recheck_at = time.monotonic() + INTERFACE_ADMIN_RECHECK_INTERVAL
+
+        enabled = [index for index, oid in oids.items() if values.get(oid) == "1"]
+        if enabled:
+            known = dict(self._known_interfaces)
+            for index in enabled:
+                known[index] = self._admin_down.pop(index)
+            self._known_interfaces = known
+            logger.info(f"{len(enabled)} interface(s) on {self.host} enabled, now polled")
+
+    def _read_interface_status(self, interfaces, wanted, deadline=None):
+        # GETs ifNumber plus ifOperStatus.<index> for each wanted interface.
+        # Returns (status_data, if_number, vanished); status_data is None when
+        # nothing was answered.
+        oids = [IF_NUMBER_OID] + [f"{INTERFACE_STATUS_OID}.{index}" for index in wanted]
+        values = self.snmp_get(oids, deadline)
+        if values is None:
+            return None, None, False
+
+        status_data = {}
+        stale = 0
+        vanished = False
+        for index in wanted:
+            oid = f"{INTERFACE_STATUS_OID}.{index}"
+            if oid not in values:
+                stale += 1
+                status_data[index] = {
+                    'name': interfaces[index],
+                    'status': "unknown",
+                    'stale': True
+                }
+            elif values[oid] is None:
+                vanished = True
+            else:
+                status_data[index] = {
+                    'name': interfaces[index],
+                    'status': format_status(values[oid]),
+                    'stale': False
+                }
+
+        if stale:
+            logger.warning(f"Partial poll of {self.host}: {stale} of {len(wanted)} interfaces stale")
+
+        return status_data, values.get(IF_NUMBER_OID), vanished
+
+# Longest prefixes are tried first, so TenGigabitEthernet wins over GigabitEthernet
+INTERFACE_NAME_ABBREVIATIONS = {
+    'GigabitEthernet': 'Gi',
+    'FastEthernet': 'Fa',
+    'TenGigabitEthernet': 'Te',
+    'TwentyFiveGigE': 'Twe',
+    'FortyGigabitEthernet': 'Fo',
+    'HundredGigE': 'Hu',
+    'TenGigE': 'Te',
+    'FortyGigE': 'Fo',
+    'Bundle-Ether': 'BE',
+    'Port-channel': 'Po',
+    'Port-Channel': 'Po',
+    'XGigabitEthernet': 'XGE',
+    'Serial': 'Se',
+    'Ethernet': 'Et',
+    'Tunnel': 'Tu',
+    'Management': 'Ma'
+}
+INTERFACE_NAME_ABBREVIATIONS.update(INTERFACE_ABBREVIATIONS)
+
+_abbreviation_prefixes = sorted(INTERFACE_NAME_ABBREVIATIONS, key=len, reverse=True)
+
+def register_interface_abbreviation(prefix, short_name):
+    global _abbreviation_prefixes
+    INTERFACE_NAME_ABBREVIATIONS[prefix] = short_name
+    _abbreviation_prefixes = sorted(INTERFACE_NAME_ABBREVIATIONS, key=len, reverse=True)
+    get_simplified_interface_name.cache_clear()
+
+@lru_cache(maxsize=4096)
 def get_simplified_interface_name(interface_name):
-    if interface_name.startswith('GigabitEthernet'):
-        return interface_name.replace('GigabitEthernet', 'Gi')
-    elif interface_name.startswith('FastEthernet'):
-        return interface_name.replace('FastEthernet', 'Fa')
-    elif interface_name.startswith('TenGigabitEthernet'):
-        return interface_name.replace('TenGigabitEthernet', 'Te')
-    elif interface_name.startswith('Serial'):
-        return interface_name.replace('Serial', 'Se')
-    elif interface_name.startswith('Ethernet'):
-        return interface_name.replace('Ethernet', 'Et')
-    else:
-        return interface_name
\ No newline at end of file
+    for prefix in _abbreviation_prefixes:
+        if interface_name.startswith(prefix):
+            return INTERFACE_NAME_ABBREVIATIONS[prefix] + interface_name[len(prefix):]
+    return interface_name
@@ -0,0 +1,127 @@
+import html
+import re
+import time
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from config import *
+from snmp_manager import get_simplified_interface_name
+
+# Status views keyed by (router ip, chat id); each holds the last snapshot
+# of the interface table plus the page and filters the chat is looking at
+status_views = {}
+
+def get_status_view(host, chat_id):
+    key = (host, chat_id)
+    if key not in status_views:
+        status_views[key] = {
+            'host': host,
+            'interfaces': [],
+            'taken_at': None,
+            'page': 0,
+            'down_only': False,
+            'has_ip': False,
+            'name_regex': None
+        }
+    return status_views[key]
+
+def is_snapshot_fresh(view):
+    if view['taken_at'] is None:
+        return False
+    return time.monotonic() - view['taken_at'] < STATUS_SNAPSHOT_TTL
+
+def store_snapshot(view, interfaces):
+    view['interfaces'] = interfaces
+    view['taken_at'] = time.monotonic()
+
+def set_name_filter(view, pattern):
+    # Raises re.error for invalid patterns, checked before touching the view
+    view['name_regex'] = re.compile(pattern, re.IGNORECASE) if pattern else None
+    view['page'] = 0
+
+def clear_filters(view):
+    view['down_only'] = False
+    view['has_ip'] = False
+    view['name_regex'] = None
+    view['page'] = 0
+
+def filter_interfaces(view):
+    interfaces = view['interfaces']
+    if view['down_only']:
+        interfaces = [i for i in interfaces if i['status'] == 'down']
+    if view['has_ip']:
+        interfaces = [i for i in interfaces if i['ip'] != 'No IP']
+    if view['name_regex'] is not None:
+        interfaces = [
+            i for i in interfaces
+            if view['name_regex'].search(i['name']) or view['name_regex'].search(get_simplified_interface_name(i['name']))
+        ]
+    return interfaces
+
+def _pages_for(count):
+    return max(1, (count + STATUS_PAGE_SIZE - 1) // STATUS_PAGE_SIZE)
+
+def page_count(view):
+    return _pages_for(len(filter_interfaces(view)))
+
+def render_status_page(view, loading=False):
+    interfaces = filter_interfaces(view)
+    pages = _pages_for(len(interfaces))
+    view['page'] = min(view['page'], pages - 1)
+    start = view['page'] * STATUS_PAGE_SIZE
+
+    active_filters = []
+    if view['down_only']:
+        active_filters.append("down only")
+    if view['has_ip']:
+        active_filters.append("has IP")
+    if view['name_regex'] is not None:
+        active_filters.append(f"name ~ /{view['name_regex'].pattern}/")
+
+    lines = [
+        f"Router Interface Status - {view['host']}",
+        f"Filters: {', '.join(active_filters) if active_filters else 'none'}",
+        "-" * 45,
+        f"{'Interface':<12} | {'IP Address':<20} | {'Status':<8}",
+        "-" * 45
+    ]
+    for interface in interfaces[start:start + STATUS_PAGE_SIZE]:
+        interface_name = get_simplified_interface_name(interface['name'])
+        lines.append(f"{interface_name:<12} | {interface['ip']:<20} | {interface['status']:<8}")
+    if not interfaces and not loading:
+        lines.append("No interfaces match the current filters")
+    lines.append("-" * 45)
+
+    up = sum(1 for i in view['interfaces'] if i['status'] == 'up')
+    down = sum(1 for i in view['interfaces'] if i['status'] == 'down')
+    if loading:
+        lines.append(f"Loading... {len(view['interfaces'])} interfaces so far")
+    else:
+        age = int(time.monotonic() - view['taken_at'])
+        lines.append(f"Page {view['page'] + 1}/{pages} | Showing {len(interfaces)} of {len(view['interfaces'])}")
+        lines.append(f"Up: {up} | Down: {down} | Snapshot age: {age}s")
+
+    text = f"<pre>{html.escape(chr(10).join(lines))}</pre>"
+    if loading:
+        return text, None
+    return text, get_status_keyboard(view, pages)
+
+def get_status_keyboard(view, pages):
+    def mark(enabled):
+        return "[x]" if enabled else "[ ]"
+
+    keyboard = [
+        [
+            InlineKeyboardButton("< Prev", callback_data="status_page:prev"),
+            InlineKeyboardButton(f"{view['page'] + 1}/{pages}", callback_data="status_page:current"),
+            InlineKeyboardButton("Next >", callback_data="status_page:next")
+        ],
+        [
+            InlineKeyboardButton(f"{mark(view['down_only'])} Down only", callback_data="status_filter:down"),
+            InlineKeyboardButton(f"{mark(view['has_ip'])} Has IP", callback_data="status_filter:ip")
+        ],
+        [
+            InlineKeyboardButton(f"{mark(view['name_regex'] is not None)} Name filter", callback_data="status_filter:name"),
+            InlineKeyboardButton("Clear filters", callback_data="status_filter:clear")
+        ],
+        [InlineKeyboardButton("Refresh", callback_data="status_refresh")]
+    ]
+    return InlineKeyboardMarkup(keyboard)